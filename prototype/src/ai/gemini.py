@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from threading import Lock
+from typing import Any
+
+try:  # pragma: no cover - optional dependency may be absent
+    import google.generativeai as genai  # type: ignore
+except ImportError:  # pragma: no cover
+    genai = None  # type: ignore
+
+_configure_lock = Lock()
+
+
+@lru_cache(maxsize=4)
+def get_model(model_name: str, api_key: str) -> Any:
+    """Return a Gemini model for ``model_name``, configuring the client once per process."""
+
+    # genai.configure mutates module-global client state, so it is serialized.
+    with _configure_lock:
+        genai.configure(api_key=api_key)
+        return genai.GenerativeModel(model_name)
@@ -2,25 +2,52 @@ from __future__ import annotations
 
 import logging
 import re
-from dataclasses import dataclass
-from datetime import datetime, time, timedelta, timezone
-from typing import Any, Iterable, List, Optional, Set, Tuple
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import deepcopy
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, time, timedelta, timezone
+from functools import cache, lru_cache, partial
+from itertools import islice
+from pathlib import Path
+from time import monotonic
+from threading import Lock
+from typing import Any, Callable, ClassVar, Hashable, Iterable, List, Mapping, Optional, Set, Tuple, TypeVar
 
 import dateparser
 from dateparser.search import search_dates
-from sqlalchemy import Select, or_, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import ColumnElement, Row, Select, case, func, or_, select
 
 from src.ai.query_planner import QueryPlan, plan_query
 from src.ai.report_generator import generate_brief, generate_report
-from src.config import LOCAL_TIMEZONE, LOCAL_TIMEZONE_NAME, SUSPICIOUS_TERMS
-from src.storage.database import Call, Contact, Location, Message, session_scope
+from src.config import (
+    GRAPH_PATH,
+    LOCAL_TIMEZONE,
+    LOCAL_TIMEZONE_NAME,
+    METADATA_PATH,
+    PARALLEL_QUERIES,
+    SUSPICIOUS_TERMS_SET,
+    VECTOR_INDEX_PATH,
+    VECTOR_MATRIX_PATH,
+)
+from src.matching import KeywordAutomaton
+from src.storage.database import Call, Contact, Keyword, Location, Message, data_generation, session_scope
 from src.storage.graph_store import GraphStore
 from src.storage.vector_store import VectorRecord, VectorStore
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+ContactRow = Row[Tuple[int, Optional[str], Optional[str], Optional[str]]]
+S = TypeVar("S", VectorStore, GraphStore)
+
+_LOCAL_UTC_OFFSET = LOCAL_TIMEZONE.utcoffset(None)
+
+
 def _format_local_iso(timestamp: datetime) -> str:
+    if timestamp.tzinfo is None:
+        # SQLite returns naive UTC wall-clock values; shift by the fixed IST offset instead of a tz conversion.
+        return (timestamp + _LOCAL_UTC_OFFSET).replace(tzinfo=LOCAL_TIMEZONE).isoformat()
     return timestamp.astimezone(LOCAL_TIMEZONE).isoformat()
 
 STOP_WORDS: Set[str] = {
@@ -96,9 +123,80 @@ CALL_TERMS = {"call", "called", "spoke", "dial", "conversation"}
 MESSAGE_TERMS = {"message", "messages", "chat", "text", "information", "topic", "note"}
 GRAPH_TERMS = {"connection", "connections", "network", "relationship", "link"}
 FOREIGN_TERMS = {"foreign", "international", "non-indian", "overseas"}
-
-
-@dataclass
+_TOPIC_STOP_TERMS: frozenset[str] = frozenset().union(STOP_WORDS, FOREIGN_TERMS, LOCATION_TERMS, CALL_TERMS, GRAPH_TERMS)
+
+_TIME_FILTER_RE = re.compile(r"after\s+(\d{1,2})(?::(\d{2}))?\s*(am|pm)?")
+_LAST_N_RE = re.compile(r"last\s+(\d+)\s+(day|days|week|weeks|month|months)")
+_BETWEEN_RE = re.compile(r"(?:between|from)\s+([\w\s,/-]+?)\s+(?:and|to)\s+([\w\s,/-]+)")
+_TOKEN_RE = re.compile(r"[a-z0-9]{3,}")
+_TIME_ONLY_RE = re.compile(r"(?:after|before|around|at)?\s*\d{1,2}(?::\d{2})?\s*(?:am|pm)")
+_NONDIGIT_RE = re.compile(r"\D")
+_TIME_OF_DAY_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?")
+_DATE_SHAPE_RE = re.compile(
+    r"\b(?:\d{4}-\d{1,2}-\d{1,2}|\d{1,2}[/.-]\d{1,2}(?:[/.-]\d{2,4})?|\d{4}|\d{1,2}(?:st|nd|rd|th)"
+    r"|jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sept?(?:ember)?"
+    r"|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+    r"|mon(?:day)?|tue(?:s|sday)?|wed(?:nesday)?|thu(?:rs|rsday)?|fri(?:day)?|sat(?:urday)?|sun(?:day)?"
+    r"|today|yesterday|tomorrow|tonight|now|ago|midnight|noon"
+    r"|(?:second|minute|hour|day|week|fortnight|month|year)s?)\b",
+    re.IGNORECASE,
+)
+
+_CONTACT_CACHE_TTL_SECONDS = 30.0
+_RESPONSE_CACHE_SIZE = 256
+_RESPONSE_CACHE_TTL_SECONDS = 60.0
+# Near-miss phrasings reuse cached evidence only when their query vectors are within cosine distance 0.05.
+_RESPONSE_CACHE_MIN_SIMILARITY = 0.95
+
+# Payload queries select plain columns so rows come back as lightweight tuples rather than ORM objects.
+_CONTACT_COLUMNS = (Contact.contact_id, Contact.name, Contact.phone_number, Contact.country)
+_KEYWORD_SEPARATOR = "\x1f"
+_MESSAGE_COLUMNS = (
+    Message.message_id,
+    Message.timestamp,
+    Message.sender_id,
+    Message.receiver_id,
+    Message.content,
+    Message.app_name,
+    # Keyword terms ride along as one delimited string instead of a second query per batch.
+    select(func.group_concat(Keyword.term, _KEYWORD_SEPARATOR))
+    .where(Keyword.message_id == Message.message_id)
+    .scalar_subquery()
+    .label("keywords"),
+)
+_CALL_COLUMNS = (
+    Call.call_id,
+    Call.start_time,
+    Call.caller_id,
+    Call.callee_id,
+    Call.duration_seconds,
+    Call.call_type,
+    Call.location,
+)
+_LOCATION_COLUMNS = (
+    Location.location_id,
+    Location.timestamp,
+    Location.contact_id,
+    Location.latitude,
+    Location.longitude,
+    Location.accuracy_meters,
+)
+
+
+@dataclass(slots=True)
+class _ContactSnapshot:
+    generation: tuple[int, int]
+    version: tuple[int, int]
+    loaded_at: float
+    contacts: list[ContactRow]
+    lookup: dict[int, ContactRow]
+    tokens: dict[int, frozenset[str]]
+    token_to_ids: dict[str, set[int]]
+    automaton: KeywordAutomaton[int]
+    report_rows: list[dict[str, Any]]
+
+
+@dataclass(slots=True)
 class QueryResponse:
     query: str
     summary: str
@@ -106,46 +204,231 @@ class QueryResponse:
     calls: list[dict[str, Any]]
     locations: list[dict[str, Any]]
     graph_insights: list[str]
-    report: str
-    narrative: str
+    # The report and narrative are generated on first access, so evidence-only callers never pay for them.
+    report_loader: Callable[[], str] = field(repr=False, compare=False)
+    narrative_loader: Callable[[], str] = field(repr=False, compare=False)
+
+    @property
+    def report(self) -> str:
+        return self.report_loader()
+
+    @property
+    def narrative(self) -> str:
+        return self.narrative_loader()
+
+
+@dataclass(slots=True)
+class _CachedResponse:
+    stored_at: float
+    query_key: str
+    query_vector: Any
+    response: QueryResponse
+
+
+class _ResponseCache:
+    """Thread-safe LRU of recent responses keyed by their retrieval fingerprint, with a TTL."""
+
+    def __init__(self, maxsize: int, ttl_seconds: float) -> None:
+        self._entries: OrderedDict[Hashable, _CachedResponse] = OrderedDict()
+        self._maxsize = maxsize
+        self._ttl_seconds = ttl_seconds
+        self._lock = Lock()
+
+    def get(self, fingerprint: Hashable) -> _CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                return None
+            if monotonic() - entry.stored_at >= self._ttl_seconds:
+                del self._entries[fingerprint]
+                return None
+            self._entries.move_to_end(fingerprint)
+            return entry
+
+    def put(self, fingerprint: Hashable, entry: _CachedResponse) -> None:
+        with self._lock:
+            self._entries[fingerprint] = entry
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
 
 
 class QueryEngine:
+    # Loaded indexes are shared by every engine in the process and reloaded when their files change.
+    _shared_indexes: ClassVar[dict[str, tuple[tuple[Any, ...], Any]]] = {}
+    _index_lock: ClassVar[Lock] = Lock()
+    _response_cache: ClassVar[_ResponseCache] = _ResponseCache(_RESPONSE_CACHE_SIZE, _RESPONSE_CACHE_TTL_SECONDS)
+    # Keyed by the normalised query text alone, so repeats are answered before any retrieval or planning starts.
+    _query_cache: ClassVar[_ResponseCache] = _ResponseCache(_RESPONSE_CACHE_SIZE, _RESPONSE_CACHE_TTL_SECONDS)
+    # One worker pool serves every engine, so constructing engines per request or per test never leaks threads.
+    _executor: ClassVar[ThreadPoolExecutor | None] = None
+    _executor_lock: ClassVar[Lock] = Lock()
+    # Bumped on every invalidation; paired with the storage data generation so per-engine caches notice a
+    # reload or re-ingest even when row counts line up.
+    _generation: ClassVar[int] = 0
+
     def __init__(self) -> None:
-        self.vector_store: VectorStore | None = VectorStore()
-        self.graph_store: GraphStore | None = GraphStore()
-        self._ensure_indexes()
+        self._contact_cache: _ContactSnapshot | None = None
+
+    @classmethod
+    def invalidate_shared_state(cls) -> None:
+        """Drop shared indexes and cached responses so the next query reloads from disk."""
+
+        with cls._index_lock:
+            cls._generation += 1
+            cls._shared_indexes.clear()
+        cls._response_cache.clear()
+        cls._query_cache.clear()
+
+    @classmethod
+    def _current_generation(cls) -> tuple[int, int]:
+        return (cls._generation, data_generation())
+
+    def warm(self) -> None:
+        """Load the shared vector and graph indexes ahead of the first query."""
+
+        vector_store = self.vector_store
+        graph_store = self.graph_store
+        logger.info(
+            "Query engine warmed (vector index %s, graph %s)",
+            "loaded" if vector_store else "missing",
+            "loaded" if graph_store else "missing",
+        )
 
-    def _ensure_indexes(self) -> None:
-        try:
-            self.vector_store.load()
-        except FileNotFoundError:
-            self.vector_store = None  # type: ignore[assignment]
+    @classmethod
+    def _shared_executor(cls) -> ThreadPoolExecutor | None:
+        if not PARALLEL_QUERIES:
+            return None
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="query-engine")
+        return cls._executor
+
+    @property
+    def vector_store(self) -> VectorStore | None:
+        return self._shared_index("vector", (VECTOR_INDEX_PATH, METADATA_PATH, VECTOR_MATRIX_PATH), VectorStore)
+
+    @property
+    def graph_store(self) -> GraphStore | None:
+        return self._shared_index("graph", (GRAPH_PATH,), GraphStore)
+
+    @classmethod
+    def _shared_index(cls, name: str, paths: Tuple[Path, ...], factory: Callable[[], S]) -> S | None:
+        version = (cls._current_generation(), *(_file_mtime(path) for path in paths))
+        cached = cls._shared_indexes.get(name)
+        if cached is None or cached[0] != version:
+            with cls._index_lock:
+                cached = cls._shared_indexes.get(name)
+                if cached is None or cached[0] != version:
+                    store: S | None = factory()
+                    try:
+                        store.load()  # type: ignore[union-attr]
+                    except FileNotFoundError:
+                        store = None
+                    cached = (version, store)
+                    cls._shared_indexes[name] = cached
+        return cached[1]
+
+    def _submit(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> Future[T]:
+        """Run ``fn`` on the worker pool, or inline when parallel queries are disabled."""
+
+        executor = self._shared_executor()
+        if executor:
+            try:
+                return executor.submit(fn, *args, **kwargs)
+            except RuntimeError:
+                # The pool refuses new work once the interpreter is shutting down; finish the query inline.
+                pass
+        future: Future[T] = Future()
         try:
-            self.graph_store.load()
-        except FileNotFoundError:
-            self.graph_store = None  # type: ignore[assignment]
+            future.set_result(fn(*args, **kwargs))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def _load_contacts(self) -> _ContactSnapshot:
+        """Return the cached contact snapshot, reloading when stale or when the table changed."""
+
+        with session_scope() as session:
+            max_id, count = session.execute(select(func.max(Contact.contact_id), func.count(Contact.contact_id))).one()
+            version = (max_id or 0, count)
+            generation = QueryEngine._current_generation()
+            cached = self._contact_cache
+            if (
+                cached
+                and cached.generation == generation
+                and cached.version == version
+                and monotonic() - cached.loaded_at < _CONTACT_CACHE_TTL_SECONDS
+            ):
+                return cached
+            contacts = list(session.execute(select(*_CONTACT_COLUMNS)).all())
+
+        if cached and cached.contacts == contacts:
+            # Unchanged rows (typically a TTL refresh) keep the derived tokens and automaton instead of rebuilding them.
+            snapshot = replace(cached, generation=generation, version=version, loaded_at=monotonic())
+            self._contact_cache = snapshot
+            return snapshot
+
+        tokens = {contact.contact_id: frozenset(_contact_tokens(contact)) for contact in contacts}
+        token_to_ids: dict[str, set[int]] = defaultdict(set)
+        automaton: KeywordAutomaton[int] = KeywordAutomaton()
+        for contact_id, contact_tokens in tokens.items():
+            for token in contact_tokens:
+                token_to_ids[token].add(contact_id)
+                automaton.add_word(token, contact_id)
+        automaton.make_automaton()
+        snapshot = _ContactSnapshot(
+            generation=generation,
+            version=version,
+            loaded_at=monotonic(),
+            contacts=contacts,
+            lookup={contact.contact_id: contact for contact in contacts},
+            tokens=tokens,
+            token_to_ids=dict(token_to_ids),
+            automaton=automaton,
+            report_rows=[contact._asdict() for contact in contacts],
+        )
+        self._contact_cache = snapshot
+        return snapshot
 
     def answer(self, query: str, limit: int = 5) -> QueryResponse:
         query_lower = query.lower()
+        query_key = " ".join(query_lower.split())
+        exact_key = (
+            query_key,
+            limit,
+            QueryEngine._current_generation(),
+            _file_mtime(VECTOR_INDEX_PATH),
+            _file_mtime(GRAPH_PATH),
+        )
+        cached = self._query_cache.get(exact_key)
+        if cached:
+            return _detached(cached.response, query)
 
-        with session_scope() as session:
-            contacts = session.query(Contact).all()
-        contact_lookup = {contact.contact_id: contact for contact in contacts}
+        vector_k = max(limit * 3, 10)
+        vector_store = self.vector_store
+        vector_future = self._submit(self._vector_candidates, vector_store, query, vector_k) if vector_store else None
+        snapshot = self._load_contacts()
+        contact_lookup = snapshot.lookup
 
-        person_ids = _detect_person_ids(query_lower, contacts)
+        person_ids = _detect_person_ids(query_lower, snapshot.automaton)
         foreign_only = any(term in query_lower for term in FOREIGN_TERMS)
-        suspicious_terms = [term for term in SUSPICIOUS_TERMS if term in query_lower]
-        topic_terms = _extract_topic_terms(query_lower, suspicious_terms, contact_lookup, person_ids)
+        suspicious_terms = [term for term in SUSPICIOUS_TERMS_SET if term in query_lower]
+        topic_terms = _extract_topic_terms(query_lower, suspicious_terms, snapshot.tokens, person_ids)
         time_filter = _extract_time_filter(query_lower)
         date_range = _extract_date_range(query)
 
-        include_locations = bool(LOCATION_TERMS.intersection(query_lower.split())) or "location" in query_lower
-        include_calls = bool(CALL_TERMS.intersection(query_lower.split())) or "call" in query_lower
-        include_graph = bool(GRAPH_TERMS.intersection(query_lower.split()))
-        include_messages = True if include_calls or include_locations else bool(MESSAGE_TERMS.intersection(query_lower.split()))
-        if not include_messages and not include_calls and not include_locations:
-            include_messages = True
+        query_words = set(query_lower.split())
+        include_locations = not LOCATION_TERMS.isdisjoint(query_words) or "location" in query_lower
+        include_calls = not CALL_TERMS.isdisjoint(query_words) or "call" in query_lower
+        include_graph = not GRAPH_TERMS.isdisjoint(query_words)
+        # The keyword heuristics always end up including messages; only the planner can switch them off.
+        include_messages = True
 
         message_limit = limit
         call_limit = limit
@@ -164,7 +447,7 @@ class QueryEngine:
             if plan.foreign_only:
                 foreign_only = True
             if plan.person_names:
-                person_ids.update(_match_contacts_by_name(plan.person_names, contacts))
+                person_ids.update(_match_contacts_by_name(plan.person_names, snapshot.token_to_ids))
             if plan.topics:
                 topic_terms.update({topic.lower() for topic in plan.topics})
             if plan.result_limit:
@@ -184,25 +467,145 @@ class QueryEngine:
         if not (include_messages or include_calls or include_locations):
             include_messages = True
 
-        messages_payload: list[dict[str, Any]] = []
-        calls_payload: list[dict[str, Any]] = []
-        locations_payload: list[dict[str, Any]] = []
-        graph_payload: list[str] = []
-
-        if include_messages:
-            messages_payload = self._collect_messages(
-                query_text=query,
+        # Everything retrieval depends on besides the query text itself; data versions keep re-ingests from hitting.
+        fingerprint = (
+            snapshot.generation,
+            snapshot.version,
+            _file_mtime(VECTOR_INDEX_PATH),
+            _file_mtime(GRAPH_PATH),
+            frozenset(person_ids),
+            foreign_only,
+            frozenset(topic_terms),
+            frozenset(suspicious_terms),
+            date_range,
+            time_filter,
+            include_messages,
+            include_calls,
+            include_locations,
+            include_graph,
+            message_limit,
+            call_limit,
+            location_limit,
+            limit,
+        )
+        cached = self._response_cache.get(fingerprint)
+        if cached and cached.query_key == query_key:
+            return _detached(cached.response, query)
+        query_vector = vector_store.embed(query) if vector_store else None
+
+        if (
+            cached
+            and query_vector is not None
+            and cached.query_vector is not None
+            and VectorStore.similarity(cached.query_vector, query_vector) >= _RESPONSE_CACHE_MIN_SIMILARITY
+        ):
+            # A rephrasing of a cached query: reuse its evidence but describe it under the new wording.
+            if vector_future:
+                vector_future.cancel()
+            messages_payload = deepcopy(cached.response.messages)
+            calls_payload = deepcopy(cached.response.calls)
+            locations_payload = deepcopy(cached.response.locations)
+            graph_payload = list(cached.response.graph_insights)
+        else:
+            messages_payload, calls_payload, locations_payload, graph_payload = self._gather_evidence(
+                query=query,
+                vector_future=vector_future,
+                vector_k=vector_k,
                 contact_lookup=contact_lookup,
                 person_ids=person_ids,
                 foreign_only=foreign_only,
                 date_range=date_range,
                 time_filter=time_filter,
                 topic_terms=topic_terms,
-                limit=message_limit,
+                include_messages=include_messages,
+                include_calls=include_calls,
+                include_locations=include_locations,
+                include_graph=include_graph,
+                message_limit=message_limit,
+                call_limit=call_limit,
+                location_limit=location_limit,
+                graph_limit=limit,
+            )
+
+        summary = self._compose_summary(
+            query=query,
+            messages=messages_payload,
+            calls=calls_payload,
+            locations=locations_payload,
+            graph_insights=graph_payload,
+            suspicious_terms=suspicious_terms,
+        )
+
+        report_loader = cache(
+            partial(
+                generate_report,
+                query=query,
+                summary=summary,
+                messages=messages_payload,
+                calls=calls_payload,
+                locations=locations_payload,
+                graph_insights=graph_payload,
+                contacts=snapshot.report_rows,
+            )
+        )
+
+        narrative_loader = cache(
+            partial(
+                generate_brief,
+                query=query,
+                summary=summary,
+                messages=messages_payload,
+                calls=calls_payload,
+                locations=locations_payload,
+                graph_insights=graph_payload,
             )
+        )
+
+        response = QueryResponse(
+            query=query,
+            summary=summary,
+            messages=messages_payload,
+            calls=calls_payload,
+            locations=locations_payload,
+            graph_insights=graph_payload,
+            report_loader=report_loader,
+            narrative_loader=narrative_loader,
+        )
+        entry = _CachedResponse(stored_at=monotonic(), query_key=query_key, query_vector=query_vector, response=response)
+        self._response_cache.put(fingerprint, entry)
+        self._query_cache.put(exact_key, entry)
+        return _detached(response, query)
 
+    def _gather_evidence(
+        self,
+        *,
+        query: str,
+        vector_future: Future[list[VectorRecord]] | None,
+        vector_k: int,
+        contact_lookup: dict[int, ContactRow],
+        person_ids: Set[int],
+        foreign_only: bool,
+        date_range: Tuple[Optional[datetime], Optional[datetime]],
+        time_filter: Optional[time],
+        topic_terms: Set[str],
+        include_messages: bool,
+        include_calls: bool,
+        include_locations: bool,
+        include_graph: bool,
+        message_limit: int,
+        call_limit: int,
+        location_limit: int,
+        graph_limit: int,
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]], list[str]]:
+        messages_future: Future[list[dict[str, Any]]] | None = None
+        calls_future: Future[list[dict[str, Any]]] | None = None
+        locations_future: Future[list[dict[str, Any]]] | None = None
+        graph_future: Future[list[str]] | None = None
+
+        # Stages that do not depend on the vector candidates are dispatched first.
         if include_calls:
-            calls_payload = self._query_calls(
+            calls_future = self._submit(
+                self._query_calls,
                 contact_lookup=contact_lookup,
                 person_ids=person_ids,
                 foreign_only=foreign_only,
@@ -212,7 +615,8 @@ class QueryEngine:
             )
 
         if include_locations:
-            locations_payload = self._query_locations(
+            locations_future = self._submit(
+                self._query_locations,
                 contact_lookup=contact_lookup,
                 person_ids=person_ids,
                 date_range=date_range,
@@ -220,60 +624,47 @@ class QueryEngine:
                 limit=location_limit,
             )
 
-        if include_graph and self.graph_store:
-            graph_payload = self._graph_summary(limit=limit)
+        if include_graph:
+            graph_future = self._submit(self._graph_summary, limit=graph_limit)
 
-        summary = self._compose_summary(
-            query=query,
-            messages=messages_payload,
-            calls=calls_payload,
-            locations=locations_payload,
-            graph_insights=graph_payload,
-            suspicious_terms=suspicious_terms,
-        )
+        if include_messages:
+            candidates: list[VectorRecord] | None = vector_future.result() if vector_future else []
+            message_k = max(message_limit * 3, 10)
+            candidates = candidates[:message_k] if message_k <= vector_k else None
+            messages_future = self._submit(
+                self._collect_messages,
+                query_text=query,
+                candidates=candidates,
+                contact_lookup=contact_lookup,
+                person_ids=person_ids,
+                foreign_only=foreign_only,
+                date_range=date_range,
+                time_filter=time_filter,
+                topic_terms=topic_terms,
+                limit=message_limit,
+            )
 
-        report = generate_report(
-            query=query,
-            summary=summary,
-            messages=messages_payload,
-            calls=calls_payload,
-            locations=locations_payload,
-            graph_insights=graph_payload,
-            contacts=[
-                {
-                    "contact_id": contact.contact_id,
-                    "name": contact.name,
-                    "phone_number": contact.phone_number,
-                    "country": contact.country,
-                }
-                for contact in contacts
-            ],
-        )
+        messages_payload = messages_future.result() if messages_future else []
+        calls_payload = calls_future.result() if calls_future else []
+        locations_payload = locations_future.result() if locations_future else []
+        graph_payload = graph_future.result() if graph_future else []
 
-        narrative = generate_brief(
-            query=query,
-            summary=summary,
-            messages=messages_payload,
-            calls=calls_payload,
-            locations=locations_payload,
-            graph_insights=graph_payload,
-        )
+        return messages_payload, calls_payload, locations_payload, graph_payload
 
-        return QueryResponse(
-            query=query,
-            summary=summary,
-            messages=messages_payload,
-            calls=calls_payload,
-            locations=locations_payload,
-            graph_insights=graph_payload,
-            report=report,
-            narrative=narrative,
-        )
+    def _vector_candidates(self, vector_store: VectorStore | None, query_text: str, k: int) -> list[VectorRecord]:
+        if not vector_store:
+            return []
+        try:
+            return vector_store.query(query_text, k=k)
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.warning("Vector query failed: %s", exc)
+            return []
 
     def _collect_messages(
         self,
         query_text: str,
-        contact_lookup: dict[int, Contact],
+        candidates: Optional[list[VectorRecord]],
+        contact_lookup: dict[int, ContactRow],
         person_ids: Set[int],
         foreign_only: bool,
         date_range: Tuple[Optional[datetime], Optional[datetime]],
@@ -282,12 +673,9 @@ class QueryEngine:
         limit: int,
     ) -> list[dict[str, Any]]:
         results: list[dict[str, Any]] = []
-        candidates: list[VectorRecord] = []
-        if self.vector_store:
-            try:
-                candidates = self.vector_store.query(query_text, k=max(limit * 3, 10))
-            except Exception as exc:  # pragma: no cover - defensive
-                logger.warning("Vector query failed: %s", exc)
+        search_terms = SUSPICIOUS_TERMS_SET.union(topic_terms) if topic_terms else None
+        if candidates is None:
+            candidates = self._vector_candidates(self.vector_store, query_text, k=max(limit * 3, 10))
         if candidates:
             results = self._enrich_messages(
                 candidates=candidates,
@@ -296,18 +684,17 @@ class QueryEngine:
                 foreign_only=foreign_only,
                 date_range=date_range,
                 time_filter=time_filter,
-                topic_terms=topic_terms,
+                search_terms=search_terms,
                 limit=limit,
             )
         if not results:
             results = self._fallback_message_search(
-                query_text=query_text,
                 contact_lookup=contact_lookup,
                 person_ids=person_ids,
                 foreign_only=foreign_only,
                 date_range=date_range,
                 time_filter=time_filter,
-                topic_terms=topic_terms,
+                search_terms=search_terms,
                 limit=limit,
             )
         return results[:limit]
@@ -315,134 +702,58 @@ class QueryEngine:
     def _enrich_messages(
         self,
         candidates: List[VectorRecord],
-        contact_lookup: dict[int, Contact],
+        contact_lookup: dict[int, ContactRow],
         person_ids: Set[int],
         foreign_only: bool,
         date_range: Tuple[Optional[datetime], Optional[datetime]],
         time_filter: Optional[time],
-        topic_terms: Set[str],
+        search_terms: Optional[frozenset[str]],
         limit: int,
     ) -> list[dict[str, Any]]:
         message_ids = [candidate.message_id for candidate in candidates]
         if not message_ids:
             return []
         with session_scope() as session:
-            stmt: Select = (
-                select(Message)
-                .where(Message.message_id.in_(message_ids))
-                .options(selectinload(Message.keywords))
-            )
-            start, end = date_range
-            if start:
-                stmt = stmt.where(Message.timestamp >= start)
-            if end:
-                stmt = stmt.where(Message.timestamp <= end)
-            if person_ids:
-                stmt = stmt.where(or_(Message.sender_id.in_(person_ids), Message.receiver_id.in_(person_ids)))
-            stmt = stmt.order_by(Message.timestamp.desc())
-            records = session.execute(stmt).scalars().all()
-
-        ranking = {message_id: index for index, message_id in enumerate(message_ids)}
-        records.sort(key=lambda message: ranking.get(message.message_id, len(ranking)))
-
-        payload: list[dict[str, Any]] = []
-        for message in records:
-            if not _timestamp_in_range(message.timestamp, date_range):
-                continue
-            if time_filter and message.timestamp.time() <= time_filter:
-                continue
-            sender = contact_lookup.get(message.sender_id)
-            receiver = contact_lookup.get(message.receiver_id)
-            if foreign_only:
-                countries = {
-                    getattr(sender, "country", None),
-                    getattr(receiver, "country", None),
-                }
-                if not any(country and country != "India" for country in countries):
-                    continue
-            content_lower = message.content.lower()
-            if topic_terms and not any(term in content_lower for term in topic_terms.union(set(k for k in SUSPICIOUS_TERMS))):
-                continue
-            payload.append(
-                {
-                    "message_id": message.message_id,
-                    "timestamp": _format_local_iso(message.timestamp),
-                    "app": message.app_name,
-                    "sender": sender.name if sender else "Unknown",
-                    "receiver": receiver.name if receiver else None,
-                    "content": message.content,
-                    "keywords": [kw.term for kw in message.keywords],
-                }
+            stmt: Select = select(*_MESSAGE_COLUMNS).where(Message.message_id.in_(message_ids))
+            stmt = _filter_messages(
+                stmt,
+                person_ids=person_ids,
+                foreign_only=foreign_only,
+                date_range=date_range,
+                time_filter=time_filter,
+                search_terms=search_terms,
             )
-            if len(payload) >= limit:
-                break
-        return payload
+            # Keep the vector ranking in SQL so the database can stop after ``limit`` rows.
+            ranking = {message_id: index for index, message_id in enumerate(message_ids)}
+            stmt = stmt.order_by(case(ranking, value=Message.message_id)).limit(limit)
+            return _message_payloads(session.execute(stmt), contact_lookup)
 
     def _fallback_message_search(
         self,
-        query_text: str,
-        contact_lookup: dict[int, Contact],
+        contact_lookup: dict[int, ContactRow],
         person_ids: Set[int],
         foreign_only: bool,
         date_range: Tuple[Optional[datetime], Optional[datetime]],
         time_filter: Optional[time],
-        topic_terms: Set[str],
+        search_terms: Optional[frozenset[str]],
         limit: int,
     ) -> list[dict[str, Any]]:
-        tokens = topic_terms or _extract_topic_terms(query_text.lower(), [], contact_lookup, person_ids)
         with session_scope() as session:
-            stmt = (
-                select(Message)
-                .order_by(Message.timestamp.desc())
-                .limit(200)
-                .options(selectinload(Message.keywords))
-            )
-            start, end = date_range
-            if start:
-                stmt = stmt.where(Message.timestamp >= start)
-            if end:
-                stmt = stmt.where(Message.timestamp <= end)
-            if person_ids:
-                stmt = stmt.where(or_(Message.sender_id.in_(person_ids), Message.receiver_id.in_(person_ids)))
-            results = session.execute(stmt).scalars().all()
-
-        payload: list[dict[str, Any]] = []
-        for message in results:
-            if not _timestamp_in_range(message.timestamp, date_range):
-                continue
-            if time_filter and message.timestamp.time() <= time_filter:
-                continue
-            sender = contact_lookup.get(message.sender_id)
-            receiver = contact_lookup.get(message.receiver_id)
-            if foreign_only:
-                countries = {
-                    getattr(sender, "country", None),
-                    getattr(receiver, "country", None),
-                }
-                if not any(country and country != "India" for country in countries):
-                    continue
-            content_lower = message.content.lower()
-            search_terms = set(tokens).union(SUSPICIOUS_TERMS)
-            if tokens and not any(term in content_lower for term in search_terms):
-                continue
-            payload.append(
-                {
-                    "message_id": message.message_id,
-                    "timestamp": _format_local_iso(message.timestamp),
-                    "app": message.app_name,
-                    "sender": sender.name if sender else "Unknown",
-                    "receiver": receiver.name if receiver else None,
-                    "content": message.content,
-                    "keywords": [kw.term for kw in message.keywords],
-                }
+            stmt = select(*_MESSAGE_COLUMNS)
+            stmt = _filter_messages(
+                stmt,
+                person_ids=person_ids,
+                foreign_only=foreign_only,
+                date_range=date_range,
+                time_filter=time_filter,
+                search_terms=search_terms,
             )
-            if len(payload) >= limit:
-                break
-        return payload
+            stmt = stmt.order_by(Message.timestamp.desc()).limit(limit)
+            return _message_payloads(session.execute(stmt), contact_lookup)
 
     def _query_calls(
         self,
-        contact_lookup: dict[int, Contact],
+        contact_lookup: dict[int, ContactRow],
         person_ids: Set[int],
         foreign_only: bool,
         date_range: Tuple[Optional[datetime], Optional[datetime]],
@@ -450,95 +761,83 @@ class QueryEngine:
         limit: int,
     ) -> list[dict[str, Any]]:
         with session_scope() as session:
-            stmt = select(Call).order_by(Call.start_time.desc()).limit(200)
+            stmt = select(*_CALL_COLUMNS)
             start, end = date_range
             if start:
                 stmt = stmt.where(Call.start_time >= start)
             if end:
                 stmt = stmt.where(Call.start_time <= end)
+            if time_filter:
+                stmt = stmt.where(_time_after_clause(Call.start_time, time_filter))
             if person_ids:
                 stmt = stmt.where(or_(Call.caller_id.in_(person_ids), Call.callee_id.in_(person_ids)))
-            calls = session.execute(stmt).scalars().all()
-
-        payload: list[dict[str, Any]] = []
-        for call in calls:
-            if not _timestamp_in_range(call.start_time, date_range):
-                continue
-            if time_filter and call.start_time.time() <= time_filter:
-                continue
-            caller = contact_lookup.get(call.caller_id)
-            callee = contact_lookup.get(call.callee_id)
             if foreign_only:
-                countries = {getattr(caller, "country", None), getattr(callee, "country", None)}
-                if not any(country and country != "India" for country in countries):
-                    continue
-            payload.append(
-                {
-                    "call_id": call.call_id,
-                    "timestamp": _format_local_iso(call.start_time),
-                    "caller": caller.name if caller else None,
-                    "callee": callee.name if callee else None,
-                    "duration_seconds": call.duration_seconds,
-                    "type": call.call_type,
-                    "location": call.location,
-                }
-            )
-            if len(payload) >= limit:
-                break
-        return payload
+                stmt = stmt.where(_foreign_contact_clause(Call.caller_id, Call.callee_id))
+            stmt = stmt.order_by(Call.start_time.desc()).limit(limit)
+            payload: list[dict[str, Any]] = []
+            for call in session.execute(stmt):
+                caller = contact_lookup.get(call.caller_id)
+                callee = contact_lookup.get(call.callee_id)
+                payload.append(
+                    {
+                        "call_id": call.call_id,
+                        "timestamp": _format_local_iso(call.start_time),
+                        "caller": caller.name if caller else None,
+                        "callee": callee.name if callee else None,
+                        "duration_seconds": call.duration_seconds,
+                        "type": call.call_type,
+                        "location": call.location,
+                    }
+                )
+            return payload
 
     def _query_locations(
         self,
-        contact_lookup: dict[int, Contact],
+        contact_lookup: dict[int, ContactRow],
         person_ids: Set[int],
         date_range: Tuple[Optional[datetime], Optional[datetime]],
         time_filter: Optional[time],
         limit: int,
     ) -> list[dict[str, Any]]:
         with session_scope() as session:
-            stmt = select(Location).order_by(Location.timestamp.desc()).limit(200)
+            stmt = select(*_LOCATION_COLUMNS)
             start, end = date_range
             if start:
                 stmt = stmt.where(Location.timestamp >= start)
             if end:
                 stmt = stmt.where(Location.timestamp <= end)
+            if time_filter:
+                stmt = stmt.where(_time_after_clause(Location.timestamp, time_filter))
             if person_ids:
                 stmt = stmt.where(Location.contact_id.in_(person_ids))
-            locations = session.execute(stmt).scalars().all()
-
-        payload: list[dict[str, Any]] = []
-        for location in locations:
-            if not _timestamp_in_range(location.timestamp, date_range):
-                continue
-            if time_filter and location.timestamp.time() <= time_filter:
-                continue
-            contact = contact_lookup.get(location.contact_id)
-            payload.append(
-                {
-                    "location_id": location.location_id,
-                    "timestamp": _format_local_iso(location.timestamp),
-                    "contact": contact.name if contact else None,
-                    "latitude": location.latitude,
-                    "longitude": location.longitude,
-                    "accuracy_meters": location.accuracy_meters,
-                }
-            )
-            if len(payload) >= limit:
-                break
-        return payload
+            stmt = stmt.order_by(Location.timestamp.desc()).limit(limit)
+            payload: list[dict[str, Any]] = []
+            for location in session.execute(stmt):
+                contact = contact_lookup.get(location.contact_id)
+                payload.append(
+                    {
+                        "location_id": location.location_id,
+                        "timestamp": _format_local_iso(location.timestamp),
+                        "contact": contact.name if contact else None,
+                        "latitude": location.latitude,
+                        "longitude": location.longitude,
+                        "accuracy_meters": location.accuracy_meters,
+                    }
+                )
+            return payload
 
     def _graph_summary(self, limit: int) -> list[str]:
-        if not self.graph_store:
+        graph_store = self.graph_store
+        if not graph_store:
             return []
         insights: list[str] = []
-        graph = self.graph_store.graph
-        for node in list(graph.nodes)[: limit * 2]:
-            neighbors = list(graph.neighbors(node))
-            if not neighbors:
+        graph = graph_store.graph
+        label = graph_store.label
+        for node in islice(graph.nodes, limit * 2):
+            neighbor_labels = [label(neighbor) for neighbor in islice(graph.neighbors(node), 5)]
+            if not neighbor_labels:
                 continue
-            label = graph.nodes[node].get("label", str(node))
-            neighbor_labels = [graph.nodes[neighbor].get("label", str(neighbor)) for neighbor in neighbors]
-            insights.append(f"{label} connects to {', '.join(neighbor_labels[:5])}")
+            insights.append(f"{label(node)} connects to {', '.join(neighbor_labels)}")
             if len(insights) >= limit:
                 break
         return insights
@@ -554,7 +853,7 @@ class QueryEngine:
     ) -> str:
         components: list[str] = []
         if suspicious_terms:
-            components.append("Flagged terms: " + ", ".join(sorted(set(suspicious_terms))))
+            components.append("Flagged terms: " + ", ".join(sorted(suspicious_terms)))
         if messages:
             components.append(f"Found {len(messages)} relevant message(s).")
         if calls:
@@ -568,8 +867,16 @@ class QueryEngine:
         return " ".join(components)
 
 
+def _file_mtime(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+@lru_cache(maxsize=1024)
 def _extract_time_filter(query: str) -> Optional[time]:
-    match = re.search(r"after\s+(\d{1,2})(?::(\d{2}))?\s*(am|pm)?", query)
+    match = _TIME_FILTER_RE.search(query)
     if not match:
         return None
     hour = int(match.group(1))
@@ -585,11 +892,20 @@ def _extract_time_filter(query: str) -> Optional[time]:
     return time(hour=hour, minute=minute)
 
 
+def _current_hour() -> datetime:
+    # Relative phrases ("last 3 days", "yesterday") depend on the clock, so cached parses are keyed per hour.
+    return datetime.now(LOCAL_TIMEZONE).replace(minute=0, second=0, microsecond=0)
+
+
 def _extract_date_range(query: str) -> Tuple[Optional[datetime], Optional[datetime]]:
+    return _extract_date_range_at(query, _current_hour())
+
+
+@lru_cache(maxsize=1024)
+def _extract_date_range_at(query: str, now: datetime) -> Tuple[Optional[datetime], Optional[datetime]]:
     text = query.lower()
-    now = datetime.now(LOCAL_TIMEZONE)
 
-    match = re.search(r"last\s+(\d+)\s+(day|days|week|weeks|month|months)", text)
+    match = _LAST_N_RE.search(text)
     if match:
         value = int(match.group(1))
         unit = match.group(2)
@@ -601,12 +917,15 @@ def _extract_date_range(query: str) -> Tuple[Optional[datetime], Optional[dateti
         start = now - timedelta(days=days)
         return _normalize_range(start, now)
 
-    between_match = re.search(r"(?:between|from)\s+([\w\s,/-]+?)\s+(?:and|to)\s+([\w\s,/-]+)", text)
+    between_match = _BETWEEN_RE.search(text)
     if between_match:
-        first = _parse_date_fragment(between_match.group(1))
-        second = _parse_date_fragment(between_match.group(2))
+        first = _parse_date_fragment_at(between_match.group(1), now)
+        second = _parse_date_fragment_at(between_match.group(2), now)
         return _normalize_range(first, second)
 
+    if not _DATE_SHAPE_RE.search(text):
+        return (None, None)
+
     results = search_dates(query, settings={"TIMEZONE": LOCAL_TIMEZONE_NAME, "RETURN_AS_TIMEZONE_AWARE": True})
     if results:
         parsed_dates = [
@@ -623,6 +942,11 @@ def _extract_date_range(query: str) -> Tuple[Optional[datetime], Optional[dateti
 
 
 def _parse_date_fragment(fragment: str) -> Optional[datetime]:
+    return _parse_date_fragment_at(fragment, _current_hour())
+
+
+@lru_cache(maxsize=1024)
+def _parse_date_fragment_at(fragment: str, now: datetime) -> Optional[datetime]:
     fragment = fragment.strip()
     if not fragment:
         return None
@@ -637,61 +961,116 @@ def _parse_date_fragment(fragment: str) -> Optional[datetime]:
     return parsed
 
 
+def _detached(response: QueryResponse, query: str) -> QueryResponse:
+    # Cached evidence is shared by every later hit, so each caller gets copies it is free to mutate.
+    return replace(
+        response,
+        query=query,
+        messages=deepcopy(response.messages),
+        calls=deepcopy(response.calls),
+        locations=deepcopy(response.locations),
+        graph_insights=list(response.graph_insights),
+    )
+
+
 def _normalize_range(start: Optional[datetime], end: Optional[datetime]) -> Tuple[Optional[datetime], Optional[datetime]]:
     if not start and not end:
         return (None, None)
-    if start and not start.tzinfo:
-        start = start.replace(tzinfo=LOCAL_TIMEZONE)
-    if end and not end.tzinfo:
-        end = end.replace(tzinfo=LOCAL_TIMEZONE)
-    if start and not end:
-        end = start
-    if end and not start:
-        start = end
-    if not start or not end:
-        return (None, None)
-    local_start = start.astimezone(LOCAL_TIMEZONE).replace(hour=0, minute=0, second=0, microsecond=0)
-    local_end = end.astimezone(LOCAL_TIMEZONE).replace(hour=23, minute=59, second=59, microsecond=999999)
-    if local_start > local_end:
-        local_start, local_end = local_end, local_start
-    return (local_start.astimezone(timezone.utc), local_end.astimezone(timezone.utc))
+    start_day = _local_date(start or end)
+    end_day = _local_date(end or start)
+    if start_day > end_day:
+        start_day, end_day = end_day, start_day
+    # The local zone has a fixed offset, so local day bounds map to UTC with a single subtraction.
+    return (
+        datetime.combine(start_day, time.min, tzinfo=timezone.utc) - _LOCAL_UTC_OFFSET,
+        datetime.combine(end_day, time.max, tzinfo=timezone.utc) - _LOCAL_UTC_OFFSET,
+    )
+
+
+def _local_date(value: datetime) -> date:
+    # Naive values are already local wall-clock times.
+    return value.date() if value.tzinfo is None else value.astimezone(LOCAL_TIMEZONE).date()
+
+
+def _message_payloads(rows: Iterable[Row], contact_lookup: Mapping[int, ContactRow]) -> list[dict[str, Any]]:
+    payload: list[dict[str, Any]] = []
+    for message_id, timestamp, sender_id, receiver_id, content, app_name, keywords in rows:
+        sender = contact_lookup.get(sender_id)
+        receiver = contact_lookup.get(receiver_id)
+        payload.append(
+            {
+                "message_id": message_id,
+                "timestamp": _format_local_iso(timestamp),
+                "app": app_name,
+                "sender": sender.name if sender else "Unknown",
+                "receiver": receiver.name if receiver else None,
+                "content": content,
+                "keywords": keywords.split(_KEYWORD_SEPARATOR) if keywords else [],
+            }
+        )
+    return payload
 
 
-def _timestamp_in_range(timestamp: datetime, date_range: Tuple[Optional[datetime], Optional[datetime]]) -> bool:
+def _filter_messages(
+    stmt: Select,
+    *,
+    person_ids: Set[int],
+    foreign_only: bool,
+    date_range: Tuple[Optional[datetime], Optional[datetime]],
+    time_filter: Optional[time],
+    search_terms: Optional[frozenset[str]],
+) -> Select:
     start, end = date_range
-    stamp = timestamp.astimezone(timezone.utc)
-    if start and stamp < start:
-        return False
-    if end and stamp > end:
-        return False
-    return True
+    if start:
+        stmt = stmt.where(Message.timestamp >= start)
+    if end:
+        stmt = stmt.where(Message.timestamp <= end)
+    if time_filter:
+        stmt = stmt.where(_time_after_clause(Message.timestamp, time_filter))
+    if person_ids:
+        stmt = stmt.where(or_(Message.sender_id.in_(person_ids), Message.receiver_id.in_(person_ids)))
+    if foreign_only:
+        stmt = stmt.where(_foreign_contact_clause(Message.sender_id, Message.receiver_id))
+    if search_terms:
+        stmt = stmt.where(Message.content.regexp_match(_terms_pattern(search_terms)))
+    return stmt
+
+
+def _terms_pattern(terms: Iterable[str]) -> str:
+    # One case-insensitive alternation is scanned once per row instead of one LIKE per term.
+    return "(?i)" + "|".join(re.escape(term) for term in sorted(set(terms), key=len, reverse=True))
+
+
+def _time_after_clause(column: Any, time_filter: time) -> ColumnElement[bool]:
+    # Stored timestamps are wall-clock strings, so compare the time-of-day portion lexically.
+    return func.strftime("%H:%M:%f", column) > time_filter.strftime("%H:%M:%S.%f")[:12]
+
+
+def _foreign_contact_clause(*contact_columns: Any) -> ColumnElement[bool]:
+    foreign_ids = select(Contact.contact_id).where(Contact.country != "India")
+    return or_(*(column.in_(foreign_ids) for column in contact_columns))
 
 
 def _extract_topic_terms(
     query_lower: str,
     suspicious_terms: Iterable[str],
-    contact_lookup: dict[int, Contact],
+    contact_tokens: Mapping[int, frozenset[str]],
     person_ids: Set[int],
 ) -> Set[str]:
-    tokens = set(re.findall(r"[a-z0-9]{3,}", query_lower))
-    tokens.difference_update(STOP_WORDS)
-    tokens.update(term for term in suspicious_terms)
-    tokens.difference_update(FOREIGN_TERMS)
-    tokens.difference_update(LOCATION_TERMS)
-    tokens.difference_update(CALL_TERMS)
-    tokens.difference_update(GRAPH_TERMS)
-    person_names = {
-        token
-        for contact_id in person_ids
-        for token in _contact_tokens(contact_lookup.get(contact_id))
-    }
-    tokens.difference_update(person_names)
+    tokens = {token for token in _TOKEN_RE.findall(query_lower) if token not in _TOPIC_STOP_TERMS}
+    tokens.update(suspicious_terms)
+    if person_ids:
+        tokens.difference_update(
+            token
+            for contact_id in person_ids
+            for token in contact_tokens.get(contact_id, ())
+        )
     return tokens
 
 
 def _looks_like_time_only(fragment: str) -> bool:
     snippet = fragment.strip().lower()
-    return bool(re.fullmatch(r"(?:after|before|around|at)?\s*\d{1,2}(?::\d{2})?\s*(?:am|pm)", snippet))
+    return bool(_TIME_ONLY_RE.fullmatch(snippet))
 
 
 def _looks_like_noise_fragment(fragment: str) -> bool:
@@ -701,17 +1080,11 @@ def _looks_like_noise_fragment(fragment: str) -> bool:
     return snippet in {"me", "yo", "tu", "il"}
 
 
-def _detect_person_ids(query_lower: str, contacts: Iterable[Contact]) -> Set[int]:
-    ids: Set[int] = set()
-    for contact in contacts:
-        for token in _contact_tokens(contact):
-            if token and token in query_lower:
-                ids.add(contact.contact_id)
-                break
-    return ids
+def _detect_person_ids(query_lower: str, automaton: KeywordAutomaton[int]) -> Set[int]:
+    return {contact_id for _, contact_id in automaton.iter(query_lower)}
 
 
-def _contact_tokens(contact: Optional[Contact]) -> Set[str]:
+def _contact_tokens(contact: Optional[ContactRow]) -> Set[str]:
     if not contact:
         return set()
     tokens: Set[str] = set()
@@ -724,39 +1097,27 @@ def _contact_tokens(contact: Optional[Contact]) -> Set[str]:
     if contact.phone_number:
         phone = contact.phone_number.lower()
         tokens.add(phone)
-        digits = re.sub(r"\D", "", phone)
+        digits = _NONDIGIT_RE.sub("", phone)
         if len(digits) >= 6:
             tokens.add(digits)
     return tokens
 
 
-def _match_contacts_by_name(names: Iterable[str], contacts: Iterable[Contact]) -> Set[int]:
-    target_tokens: List[Set[str]] = []
+def _match_contacts_by_name(names: Iterable[str], token_to_ids: Mapping[str, Set[int]]) -> Set[int]:
+    matched: Set[int] = set()
     for name in names:
         lowered = name.strip().lower()
         if not lowered:
             continue
-        token_set = set(re.findall(r"[a-z0-9]{3,}", lowered))
-        token_set.add(lowered)
-        target_tokens.append(token_set)
-    if not target_tokens:
-        return set()
-
-    matched: Set[int] = set()
-    for contact in contacts:
-        contact_tokens = _contact_tokens(contact)
-        if not contact_tokens:
-            continue
-        for token_set in target_tokens:
-            if token_set.intersection(contact_tokens):
-                matched.add(contact.contact_id)
-                break
+        for token in (lowered, *_TOKEN_RE.findall(lowered)):
+            matched.update(token_to_ids.get(token, ()))
     return matched
 
 
+@lru_cache(maxsize=1024)
 def _parse_time_of_day(text: str) -> Optional[time]:
     snippet = text.strip().lower()
-    match = re.search(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?", snippet)
+    match = _TIME_OF_DAY_RE.search(snippet)
     if not match:
         return None
     hour = int(match.group(1))
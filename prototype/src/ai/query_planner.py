@@ -3,14 +3,19 @@ from __future__ import annotations
 import json
 import logging
 import os
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
 from textwrap import dedent
 from typing import Any, Dict, List, Optional
 
-try:  # pragma: no cover - optional dependency may be absent
-    import google.generativeai as genai  # type: ignore
+from src.ai.gemini import genai, get_model
+
+try:  # pragma: no cover - optional faster JSON parser
+    import orjson  # type: ignore
 except ImportError:  # pragma: no cover
-    genai = None  # type: ignore
+    orjson = None  # type: ignore
+
+_json_loads = orjson.loads if orjson else json.loads
 
 logger = logging.getLogger(__name__)
 
@@ -39,23 +44,28 @@ def plan_query(query: str) -> Optional[QueryPlan]:
         return None
 
     model_name = os.getenv("GEMINI_MODEL_NAME", "gemini-1.5-flash")
-    prompt = _build_prompt(query)
 
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel(model_name)
-        response = model.generate_content(prompt)
-        raw_text = _extract_text(response)
-        payload = _load_plan_dict(raw_text)
-        return _dict_to_plan(payload)
+        plan = _request_plan(query, model_name, api_key)
     except Exception as exc:  # pragma: no cover - defensive logging only
         logger.warning("Gemini query planning failed: %s", exc)
         return None
+    # The memoized plan is shared across callers and threads; hand out copies of its mutable lists.
+    return replace(plan, person_names=list(plan.person_names), topics=list(plan.topics))
 
 
-def _build_prompt(query: str) -> str:
-    safe_query = query.replace("\"", "\\\"")
-    template = """
+@lru_cache(maxsize=1024)
+def _request_plan(query: str, model_name: str, api_key: str) -> QueryPlan:
+    # Failures raise and are therefore never cached; only successful plans are memoized.
+    model = get_model(model_name, api_key)
+    response = model.generate_content(_build_prompt(query))
+    raw_text = _extract_text(response)
+    payload = _load_plan_dict(raw_text)
+    return _dict_to_plan(payload)
+
+
+_PLAN_PROMPT_PREFIX = dedent(
+    """
     You are an investigative assistant. Convert the analyst query into a JSON instruction that
     drives a forensic retrieval engine. Never include commentary or markdown fences—respond with
     JSON ONLY that conforms exactly to this schema:
@@ -83,10 +93,13 @@ def _build_prompt(query: str) -> str:
     - For relative requests like "latest" or "last location", set location_limit to 1.
     - For explicit limits such as "top 3" or "first five", put the numeric value into result_limit.
     - Leave fields null when the query doesn't provide that information.
-
-    Query: "{query}"
     """
-    return dedent(template).strip().replace("{query}", safe_query)
+).strip()
+
+
+def _build_prompt(query: str) -> str:
+    # json.dumps escapes quotes, backslashes and control characters in the embedded query.
+    return f'{_PLAN_PROMPT_PREFIX}\n\nQuery: "{json.dumps(query, ensure_ascii=False)[1:-1]}"'
 
 
 def _extract_text(response: Any) -> str:
@@ -116,7 +129,7 @@ def _load_plan_dict(raw_text: str) -> Dict[str, Any]:
     if start == -1 or end == -1 or end < start:
         raise ValueError(f"Could not locate JSON object in response: {raw_text!r}")
     json_blob = raw_text[start : end + 1]
-    return json.loads(json_blob)
+    return _json_loads(json_blob)
 
 
 def _dict_to_plan(data: Dict[str, Any]) -> QueryPlan:
@@ -2,16 +2,21 @@ from __future__ import annotations
 
 import logging
 import os
+from collections import OrderedDict
+from hashlib import sha256
 from textwrap import dedent
-from typing import Any, Iterable, List, Mapping
+from threading import Lock
+from typing import Any, Callable, Iterable, List, Mapping, Optional, Tuple
 
-try:  # pragma: no cover - optional dependency may be absent in tests
-    import google.generativeai as genai  # type: ignore
-except ImportError:  # pragma: no cover
-    genai = None  # type: ignore
+from src.ai.gemini import genai, get_model
 
 logger = logging.getLogger(__name__)
 
+_TEXT_CACHE_SIZE = 256
+# Generated text keyed by model and prompt digest; holds neither the prompt, the API key nor SDK response objects.
+_text_cache: OrderedDict[Tuple[str, bytes], str] = OrderedDict()
+_text_cache_lock = Lock()
+
 _REPORT_TEMPLATE = """# Investigation Summary\n\n## Scope\n- Query: {query}\n- Findings: {summary}\n\n## Communications\n{messages}\n\n## Call Activity\n{calls}\n\n## Location Trail\n{locations}\n\n## Network Insights\n{graph}\n"""
 
 
@@ -42,68 +47,110 @@ def generate_report(
 
     if api_key and genai:  # pragma: no branch - simple guard
         try:
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel(model_name)
-            prompt = _build_prompt(payload)
-            response = model.generate_content(prompt)
-            text = getattr(response, "text", None)
+            text = _generate_text(model_name, api_key, _build_prompt(payload), _report_text)
             if text:
-                return text.strip()
-            if getattr(response, "candidates", None):
-                candidate_text = "".join(
-                    part.text
-                    for candidate in response.candidates  # type: ignore[attr-defined]
-                    for part in getattr(candidate, "content", {}).get("parts", [])
-                    if getattr(part, "text", None)
-                )
-                if candidate_text:
-                    return candidate_text.strip()
+                return text
         except Exception as exc:  # pragma: no cover - network failure handled gracefully
             logger.warning("Gemini report generation failed: %s", exc)
 
     return _fallback_report(payload)
 
 
-def _build_prompt(payload: Mapping[str, Any]) -> str:
-    return dedent(
-        f"""
-        You are a digital forensics analyst. Draft a concise, evidence-backed narrative based on the data provided.
-        Respond in markdown with sections for Summary, Key Individuals, Communications, Calls, Locations, and Recommendations.
-
-        ## Original Query
-        {payload['query']}
-
-        ## High-Level Findings
-        {payload['summary']}
-
-        ## Messages
-        {payload['messages']}
-
-        ## Calls
-        {payload['calls']}
-
-        ## Locations
-        {payload['locations']}
+def _generate_text(
+    model_name: str, api_key: str, prompt: str, extract: Callable[[Any], Optional[str]]
+) -> Optional[str]:
+    # Identical prompts (same query over the same evidence) reuse the earlier text; failures and empty replies are not cached.
+    key = (model_name, sha256(prompt.encode("utf-8")).digest())
+    with _text_cache_lock:
+        text = _text_cache.get(key)
+        if text is not None:
+            _text_cache.move_to_end(key)
+            return text
+
+    text = extract(get_model(model_name, api_key).generate_content(prompt))
+    if text:
+        with _text_cache_lock:
+            _text_cache[key] = text
+            _text_cache.move_to_end(key)
+            while len(_text_cache) > _TEXT_CACHE_SIZE:
+                _text_cache.popitem(last=False)
+    return text
+
+
+def _report_text(response: Any) -> Optional[str]:
+    text = getattr(response, "text", None)
+    if text:
+        return text.strip()
+    if getattr(response, "candidates", None):
+        candidate_text = "".join(
+            part.text
+            for candidate in response.candidates
+            for part in getattr(candidate, "content", {}).get("parts", [])
+            if getattr(part, "text", None)
+        )
+        if candidate_text:
+            return candidate_text.strip()
+    return None
+
+
+def _brief_text(response: Any) -> Optional[str]:
+    text = getattr(response, "text", None)
+    if text:
+        return text.strip()
+    if getattr(response, "candidates", None):
+        for candidate in response.candidates:
+            parts = getattr(candidate, "content", {}).get("parts", [])
+            for part in parts:
+                value = getattr(part, "text", None)
+                if value:
+                    return value.strip()
+    return None
+
+
+_REPORT_PROMPT = dedent(
+    """
+    You are a digital forensics analyst. Draft a concise, evidence-backed narrative based on the data provided.
+    Respond in markdown with sections for Summary, Key Individuals, Communications, Calls, Locations, and Recommendations.
+
+    ## Original Query
+    {query}
+
+    ## High-Level Findings
+    {summary}
+
+    ## Messages
+    {messages}
+
+    ## Calls
+    {calls}
+
+    ## Locations
+    {locations}
+
+    ## Graph Insights
+    {graph_insights}
+
+    ## Contacts
+    {contacts}
+    """
+).strip()
 
-        ## Graph Insights
-        {payload['graph_insights']}
 
-        ## Contacts
-        {payload['contacts']}
-        """
-    ).strip()
+def _build_prompt(payload: Mapping[str, Any]) -> str:
+    return _REPORT_PROMPT.format_map(payload)
 
 
 def _fallback_report(payload: Mapping[str, Any]) -> str:
     def _format_section(items: Iterable[Mapping[str, Any]], fields: List[str]) -> str:
+        # Field labels are derived once per section rather than once per row.
+        labelled = [(field, field.replace("_", " ").title()) for field in fields]
         rows = []
         for item in items:
-            parts = []
-            for field in fields:
-                value = item.get(field)
-                if value is None or value == "":
-                    continue
-                parts.append(f"{field.replace('_', ' ').title()}: {value}")
+            parts = [
+                f"{label}: {value}"
+                for field, label in labelled
+                if (value := item.get(field)) is not None and value != ""
+            ]
             if parts:
                 rows.append("- " + "; ".join(parts))
         return "\n".join(rows) if rows else "- No relevant entries found."
@@ -157,52 +204,44 @@ def generate_brief(
 
     if api_key and genai:  # pragma: no branch
         try:
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel(model_name)
-            prompt = _build_brief_prompt(payload)
-            response = model.generate_content(prompt)
-            text = getattr(response, "text", None)
+            text = _generate_text(model_name, api_key, _build_brief_prompt(payload), _brief_text)
             if text:
-                return text.strip()
-            if getattr(response, "candidates", None):
-                for candidate in response.candidates:  # type: ignore[attr-defined]
-                    parts = getattr(candidate, "content", {}).get("parts", [])
-                    for part in parts:
-                        value = getattr(part, "text", None)
-                        if value:
-                            return value.strip()
+                return text
         except Exception as exc:  # pragma: no cover
             logger.warning("Gemini brief generation failed: %s", exc)
 
     return _fallback_brief(payload)
 
 
-def _build_brief_prompt(payload: Mapping[str, Any]) -> str:
-    return dedent(
-        f"""
-        You are an investigative assistant. Write a concise answer (max 3 sentences) that directly addresses the analyst query
-        using the available evidence. Mention specific contacts, times, or locations when relevant and highlight any risky or
-        foreign activity. Respond with plain text only.
+_BRIEF_PROMPT = dedent(
+    """
+    You are an investigative assistant. Write a concise answer (max 3 sentences) that directly addresses the analyst query
+    using the available evidence. Mention specific contacts, times, or locations when relevant and highlight any risky or
+    foreign activity. Respond with plain text only.
 
-        ## Query
-        {payload['query']}
+    ## Query
+    {query}
 
-        ## Summary
-        {payload['summary']}
+    ## Summary
+    {summary}
 
-        ## Messages
-        {payload['messages']}
+    ## Messages
+    {messages}
 
-        ## Calls
-        {payload['calls']}
+    ## Calls
+    {calls}
 
-        ## Locations
-        {payload['locations']}
+    ## Locations
+    {locations}
 
-        ## Graph Insights
-        {payload['graph_insights']}
-        """
-    ).strip()
+    ## Graph Insights
+    {graph_insights}
+    """
+).strip()
+
+
+def _build_brief_prompt(payload: Mapping[str, Any]) -> str:
+    return _BRIEF_PROMPT.format_map(payload)
 
 
 def _fallback_brief(payload: Mapping[str, Any]) -> str:
@@ -1,21 +1,37 @@
 from __future__ import annotations
 
 import shutil
+import tarfile
+import zipfile
+import zlib
 from datetime import datetime
+from functools import partial
 from os import getenv
 from pathlib import Path
-from typing import Optional
+from threading import Lock
+from typing import BinaryIO, Callable, Optional
 from uuid import uuid4
 
 from fastapi import FastAPI, File, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 from src.ai.query_engine import QueryEngine
 from src.ingestion.pipeline import ingest
 from src.config import UPLOAD_ROOT
 
-app = FastAPI(title="UFDR Assistant Prototype", version="0.1.0")
+try:  # pragma: no cover - optional faster JSON encoder
+    import orjson  # type: ignore  # noqa: F401
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+app = FastAPI(
+    title="UFDR Assistant Prototype",
+    version="0.1.0",
+    default_response_class=ORJSONResponse if orjson else JSONResponse,
+)
 
 env_origin_list = [origin.strip() for origin in getenv("UFDR_ALLOWED_ORIGINS", "").split(",") if origin.strip()]
 allow_all = not env_origin_list
@@ -30,6 +46,8 @@ app.add_middleware(
 )
 
 EXPECTED_DATA_FILES = {"contacts.csv", "messages.xml"}
+# Raised while reading malformed, truncated or unsupported archives (corrupt deflate streams, early EOF, unknown codecs).
+ARCHIVE_ERRORS = (zipfile.BadZipFile, tarfile.TarError, ValueError, zlib.error, EOFError, NotImplementedError, OSError)
 
 UPLOAD_ROOT.mkdir(parents=True, exist_ok=True)
 
@@ -45,6 +63,27 @@ class QueryRequest(BaseModel):
     limit: int = 5
 
 
+_engine: QueryEngine | None = None
+_engine_lock = Lock()
+
+
+def get_engine() -> QueryEngine:
+    global _engine
+    engine = _engine
+    if engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = QueryEngine()
+            engine = _engine
+    return engine
+
+
+@app.on_event("startup")
+async def warm_query_engine() -> None:
+    # Load the indexes before the first request instead of during it.
+    get_engine().warm()
+
+
 @app.get("/health")
 async def health() -> dict[str, str]:
     return {"status": "ok"}
@@ -63,62 +102,92 @@ def _resolve_data_root(directory: Path) -> Path:
     return directory
 
 
+def _is_within(root: Path, member_name: str) -> bool:
+    target = (root / member_name).resolve()
+    return target == root or root in target.parents
+
+
+def _extract_zip(fileobj: BinaryIO, destination: Path) -> None:
+    with zipfile.ZipFile(fileobj) as archive:
+        for name in archive.namelist():
+            if not _is_within(destination, name):
+                raise ValueError(f"Archive member escapes extraction directory: {name}")
+        archive.extractall(destination)
+
+
+def _extract_tar(fileobj: BinaryIO, destination: Path, mode: str) -> None:
+    # Stream mode ("r|...") reads members sequentially straight from the upload without seeking.
+    with tarfile.open(fileobj=fileobj, mode=mode) as archive:
+        for member in archive:
+            if not _is_within(destination, member.name) or not (member.isfile() or member.isdir()):
+                raise ValueError(f"Unsupported or unsafe archive member: {member.name}")
+            archive.extract(member, destination)
+
+
 @app.post("/upload-ufdr")
 async def upload_ufdr(file: UploadFile = File(...)) -> dict[str, str]:
     if not file.filename:
         raise HTTPException(status_code=400, detail="Uploaded file must include a filename.")
 
-    unique_dir = UPLOAD_ROOT / f"{datetime.utcnow():%Y%m%d_%H%M%S}_{uuid4().hex[:8]}"
+    unique_dir = (UPLOAD_ROOT / f"{datetime.utcnow():%Y%m%d_%H%M%S}_{uuid4().hex[:8]}").resolve()
     unique_dir.mkdir(parents=True, exist_ok=True)
 
-    temp_path = unique_dir / file.filename
-    try:
-        with temp_path.open("wb") as buffer:
-            while True:
-                chunk = await file.read(1_048_576)
-                if not chunk:
-                    break
-                buffer.write(chunk)
-    finally:
-        await file.close()
-
-    suffixes = [suffix.lower() for suffix in temp_path.suffixes]
-    format_hint: Optional[str] = None
+    filename = Path(file.filename).name
+    suffixes = [suffix.lower() for suffix in Path(filename).suffixes]
+    extractor: Optional[Callable[[BinaryIO, Path], None]] = None
 
-    if suffixes[-2:] == [".tar", ".gz"]:
-        format_hint = "gztar"
-    elif suffixes and suffixes[-1] in {".zip", ".tgz"}:
-        format_hint = "zip" if suffixes[-1] == ".zip" else "gztar"
-    elif suffixes and suffixes[-1] == ".ufdr":
-        format_hint = "zip"
+    if suffixes[-2:] == [".tar", ".gz"] or (suffixes and suffixes[-1] == ".tgz"):
+        extractor = partial(_extract_tar, mode="r|gz")
+    elif suffixes and suffixes[-1] in {".zip", ".ufdr"}:
+        extractor = _extract_zip
     elif suffixes and suffixes[-1] == ".tar":
-        format_hint = "tar"
+        extractor = partial(_extract_tar, mode="r|")
 
-    extraction_root = unique_dir
-
-    if format_hint:
-        try:
-            shutil.unpack_archive(str(temp_path), str(unique_dir), format=format_hint)
-        except (shutil.ReadError, ValueError) as exc:
-            raise HTTPException(status_code=400, detail=f"Failed to unpack UFDR archive: {exc}") from exc
-        temp_path.unlink(missing_ok=True)
-        extraction_root = _resolve_data_root(unique_dir)
-    else:
-        extraction_root = _resolve_data_root(unique_dir)
+    try:
+        if extractor:
+            # Unpack directly from the uploaded stream instead of copying it to disk and reading it back.
+            await run_in_threadpool(extractor, file.file, unique_dir)
+        else:
+            with (unique_dir / filename).open("wb") as buffer:
+                while True:
+                    chunk = await file.read(1_048_576)
+                    if not chunk:
+                        break
+                    buffer.write(chunk)
+    except ARCHIVE_ERRORS as exc:
+        # Never leave a half-extracted case directory behind for a later /ingest to pick up.
+        shutil.rmtree(unique_dir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail=f"Failed to unpack UFDR archive: {exc}") from exc
+    except BaseException:
+        shutil.rmtree(unique_dir, ignore_errors=True)
+        raise
+    finally:
+        await file.close()
 
+    extraction_root = _resolve_data_root(unique_dir)
     return {"status": "success", "data_path": str(extraction_root)}
 
 
 @app.post("/ingest")
-async def trigger_ingest(request: IngestRequest) -> dict:
+def trigger_ingest(request: IngestRequest) -> dict:
     path = Path(request.data_path) if request.data_path else None
     stats = ingest(root=path, case_id=request.case_id, reset=request.reset)
     return {"status": "success", "ingested": stats}
 
 
+@app.post("/admin/reload")
+def reload_engine() -> dict[str, str]:
+    global _engine
+    # Requests already holding the old engine finish on it; new requests pick up a fresh one.
+    with _engine_lock:
+        _engine = None
+        QueryEngine.invalidate_shared_state()
+    return {"status": "reloaded"}
+
+
 @app.post("/query")
-async def query(request: QueryRequest) -> dict:
-    engine = QueryEngine()
+def query(request: QueryRequest) -> dict:
+    engine = get_engine()
     response = engine.answer(request.query, limit=request.limit)
     return {
         "query": response.query,
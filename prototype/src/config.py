@@ -1,4 +1,5 @@
 from datetime import timedelta, timezone
+from os import getenv
 from pathlib import Path
 from typing import Final
 
@@ -6,6 +7,7 @@ PROJECT_ROOT: Final[Path] = Path(__file__).resolve().parent.parent
 DATA_DIR: Final[Path] = PROJECT_ROOT / "data" / "sample_ufdr"
 DB_PATH: Final[Path] = PROJECT_ROOT / "ufdr_assistant.db"
 VECTOR_INDEX_PATH: Final[Path] = PROJECT_ROOT / "vector_index.joblib"
+VECTOR_MATRIX_PATH: Final[Path] = PROJECT_ROOT / "vector_matrix.npz"
 METADATA_PATH: Final[Path] = PROJECT_ROOT / "vector_metadata.json"
 GRAPH_PATH: Final[Path] = PROJECT_ROOT / "graph.json"
 UPLOAD_ROOT: Final[Path] = PROJECT_ROOT / "uploads"
@@ -19,6 +21,12 @@ SUSPICIOUS_TERMS: Final[list[str]] = [
     "cash",
     "broker",
 ]
+SUSPICIOUS_TERMS_SET: Final[frozenset[str]] = frozenset(term.lower() for term in SUSPICIOUS_TERMS)
 
 LOCAL_TIMEZONE: Final[timezone] = timezone(timedelta(hours=5, minutes=30))
 LOCAL_TIMEZONE_NAME: Final[str] = "Asia/Kolkata"
+
+PARALLEL_QUERIES: Final[bool] = getenv("UFDR_PARALLEL_QUERIES", "1").strip().lower() not in {"0", "false", "no"}
+
+# Opt-in: keep the TF-IDF index in float32, halving the bytes scanned per vector query.
+VECTOR_FLOAT32: Final[bool] = getenv("UFDR_VECTOR_FLOAT32", "0").strip().lower() in {"1", "true", "yes"}
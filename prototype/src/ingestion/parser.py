@@ -2,17 +2,33 @@ from __future__ import annotations
 
 import csv
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
 import logging
 from pathlib import Path
-from typing import Iterable, List
+import re
+import sys
+from typing import Iterator
+import xml.etree.ElementTree as ET
 
-import xmltodict
+try:  # pragma: no cover - optional C ISO-8601 parser
+    import ciso8601  # type: ignore
+except ImportError:  # pragma: no cover
+    ciso8601 = None  # type: ignore
 
 from src.config import DATA_DIR, LOCAL_TIMEZONE, SUSPICIOUS_TERMS
 
 logger = logging.getLogger(__name__)
 
+_COUNTRY_BY_PREFIX: dict[str, str] = {
+    "+91": "India",
+    "+44": "United Kingdom",
+    "+1": "United States",
+}
+_COUNTRY_PREFIX_RE = re.compile(
+    "^(" + "|".join(re.escape(prefix) for prefix in sorted(_COUNTRY_BY_PREFIX, key=len, reverse=True)) + ")"
+)
+
 
 @dataclass
 class ContactRecord:
@@ -82,40 +98,53 @@ class UFDRParser:
     def _parse_contacts(self) -> list[ContactRecord]:
         contacts: list[ContactRecord] = []
         path = self.root / "contacts.csv"
-        with path.open("r", encoding="utf-8") as fh:
-            reader = csv.DictReader(fh)
+        with path.open("r", encoding="utf-8", newline="") as fh:
+            reader = csv.reader(fh)
+            contact_id, name, phone, email, source_app = _column_indices(
+                reader, path, ("ContactID",), ("Name", "PhoneNumber", "Email", "SourceApp")
+            )
             for row in reader:
+                if not row:
+                    continue
+                phone_number = _cell(row, phone)
                 record = ContactRecord(
-                    external_id=row["ContactID"],
-                    name=row.get("Name") or None,
-                    phone_number=_normalize_phone(row.get("PhoneNumber")),
-                    email=row.get("Email") or None,
-                    source_app=row.get("SourceApp") or None,
-                    country=_determine_country(row.get("PhoneNumber")),
+                    external_id=_cell(row, contact_id),
+                    name=_cell(row, name) or None,
+                    phone_number=_normalize_phone(phone_number),
+                    email=_cell(row, email) or None,
+                    source_app=_cell(row, source_app) or None,
+                    country=_determine_country(phone_number),
                 )
                 contacts.append(record)
-                if record.name:
-                    self._contact_lookup[record.name] = record
-                if record.phone_number:
-                    self._contact_lookup[record.phone_number] = record
+                self._register_contact(record, record.name, record.phone_number)
         return contacts
 
     def _parse_calls(self) -> list[CallRecord]:
         records: list[CallRecord] = []
         path = self.root / "calls.csv"
-        with path.open("r", encoding="utf-8") as fh:
-            reader = csv.DictReader(fh)
+        with path.open("r", encoding="utf-8", newline="") as fh:
+            reader = csv.reader(fh)
+            call_id, caller_id, callee_id, call_type, start_time, duration, location = _column_indices(
+                reader,
+                path,
+                ("CallID", "CallerID", "CalleeID"),
+                ("Type", "StartTime", "DurationSeconds", "Location"),
+            )
             for row in reader:
-                caller = self._get_or_create_contact(row["CallerID"], row.get("CallerID"))
-                callee = self._get_or_create_contact(row["CalleeID"], row.get("CalleeID"))
+                if not row:
+                    continue
+                caller_value = _cell(row, caller_id)
+                callee_value = _cell(row, callee_id)
+                caller = self._get_or_create_contact(caller_value, caller_value)
+                callee = self._get_or_create_contact(callee_value, callee_value)
                 record = CallRecord(
-                    external_id=row["CallID"],
+                    external_id=_cell(row, call_id),
                     caller_external_id=caller.external_id,
                     callee_external_id=callee.external_id,
-                    call_type=row.get("Type", "Unknown"),
-                    start_time=_parse_datetime(row.get("StartTime")),
-                    duration_seconds=int(row.get("DurationSeconds") or 0),
-                    location=row.get("Location") or None,
+                    call_type=_cell(row, call_type, "Unknown"),
+                    start_time=_parse_datetime(_cell(row, start_time)),
+                    duration_seconds=int(_cell(row, duration) or 0),
+                    location=_cell(row, location) or None,
                 )
                 records.append(record)
         return records
@@ -125,63 +154,84 @@ class UFDRParser:
         path = self.root / "locations.csv"
         if not path.exists():
             return records
-        with path.open("r", encoding="utf-8") as fh:
-            reader = csv.DictReader(fh)
+        with path.open("r", encoding="utf-8", newline="") as fh:
+            reader = csv.reader(fh)
+            location_id, contact_id, latitude, longitude, timestamp, accuracy = _column_indices(
+                reader,
+                path,
+                ("LocationID", "ContactID", "Latitude", "Longitude"),
+                ("Timestamp", "AccuracyMeters"),
+            )
             for row in reader:
-                contact = self._get_or_create_contact(row["ContactID"], row.get("ContactID"))
+                if not row:
+                    continue
+                contact_value = _cell(row, contact_id)
+                contact = self._get_or_create_contact(contact_value, contact_value)
+                accuracy_value = _cell(row, accuracy)
                 records.append(
                     LocationRecord(
-                        location_id=row["LocationID"],
+                        location_id=_cell(row, location_id),
                         contact_external_id=contact.external_id,
-                        latitude=float(row["Latitude"]),
-                        longitude=float(row["Longitude"]),
-                        timestamp=_parse_datetime(row.get("Timestamp")),
-                        accuracy_meters=float(row["AccuracyMeters"]) if row.get("AccuracyMeters") else None,
+                        latitude=float(_cell(row, latitude)),
+                        longitude=float(_cell(row, longitude)),
+                        timestamp=_parse_datetime(_cell(row, timestamp)),
+                        accuracy_meters=float(accuracy_value) if accuracy_value else None,
                     )
                 )
         return records
 
     def _parse_messages(self) -> list[MessageRecord]:
         path = self.root / "messages.xml"
-        with path.open("r", encoding="utf-8") as fh:
-            doc = xmltodict.parse(fh.read())
-        chats = doc["messages"]["chat"]
-        if isinstance(chats, dict):
-            chats = [chats]
         records: list[MessageRecord] = []
-        for chat in chats:
-            app = chat.get("@app") or None
-            messages: Iterable[dict] = chat.get("message", [])
-            if isinstance(messages, dict):
-                messages = [messages]
-            for message in messages:
-                sender_name = message.get("sender") or message.get("@sender")
-                receiver_name = message.get("receiver") or message.get("@receiver")
-                sender_contact = self._get_or_create_contact(sender_name or "Unknown", sender_name)
-                receiver_contact = self._get_or_create_contact(receiver_name, receiver_name) if receiver_name else None
-                text = message.get("text", "").strip()
-                keywords = _extract_keywords(text)
-                records.append(
-                    MessageRecord(
-                        external_id=message.get("@id") or message.get("id") or _generate_message_id(len(records)),
-                        sender_external_id=sender_contact.external_id,
-                        receiver_external_id=receiver_contact.external_id if receiver_contact else None,
-                        timestamp=_parse_datetime(message.get("timestamp") or message.get("@timestamp")),
-                        content=text,
-                        app_name=app,
-                        media_path=_extract_media_path(message),
-                        keywords=keywords,
-                    )
-                )
+        # iterparse builds one <message> at a time in C; clearing finished elements keeps memory flat.
+        context = ET.iterparse(path, events=("start", "end"))
+        _, root = next(context)
+        depth = 1
+        app: str | None = None
+        for event, elem in context:
+            if event == "start":
+                depth += 1
+                if depth == 2 and elem.tag == "chat":
+                    app = elem.get("app") or None
+                continue
+            depth -= 1
+            if depth == 2 and elem.tag == "message":
+                records.append(self._build_message(elem, app, len(records)))
+                elem.clear()
+            elif depth == 1 and elem.tag == "chat":
+                root.clear()
         return records
 
+    def _build_message(self, message: ET.Element, app: str | None, sequence: int) -> MessageRecord:
+        sender_name = _child_text(message, "sender") or message.get("sender")
+        receiver_name = _child_text(message, "receiver") or message.get("receiver")
+        sender_contact = self._get_or_create_contact(sender_name or "Unknown", sender_name)
+        receiver_contact = self._get_or_create_contact(receiver_name, receiver_name) if receiver_name else None
+        text = _child_text(message, "text") or ""
+        return MessageRecord(
+            external_id=message.get("id") or _child_text(message, "id") or _generate_message_id(sequence),
+            sender_external_id=sender_contact.external_id,
+            receiver_external_id=receiver_contact.external_id if receiver_contact else None,
+            timestamp=_parse_datetime(_child_text(message, "timestamp") or message.get("timestamp")),
+            content=text,
+            app_name=app,
+            media_path=_extract_media_path(message),
+            keywords=_extract_keywords(text),
+        )
+
     def _get_or_create_contact(self, identifier: str | None, name_hint: str | None) -> ContactRecord:
-        if identifier and identifier in self._contact_lookup:
-            return self._contact_lookup[identifier]
-        if name_hint and name_hint in self._contact_lookup:
-            return self._contact_lookup[name_hint]
+        lookup = self._contact_lookup
+        if identifier:
+            record = lookup.get(identifier)
+            if record is not None:
+                return record
+        # Most call sites pass the identifier as its own name hint; skip the repeat probe.
+        if name_hint and name_hint != identifier:
+            record = lookup.get(name_hint)
+            if record is not None:
+                return record
         # create synthetic contact entry
-        synthetic_id = identifier or f"virtual_{len(self._contact_lookup) + 1}"
+        synthetic_id = identifier or f"virtual_{len(lookup) + 1}"
         record = ContactRecord(
             external_id=synthetic_id,
             name=name_hint,
@@ -190,14 +240,38 @@ class UFDRParser:
             source_app=None,
             country=_determine_country(identifier),
         )
-        if record.name:
-            self._contact_lookup[record.name] = record
-        if record.phone_number:
-            self._contact_lookup[record.phone_number] = record
-        self._contact_lookup[record.external_id] = record
+        self._register_contact(record, record.name, record.phone_number, record.external_id)
         return record
 
+    def _register_contact(self, record: ContactRecord, *keys: str | None) -> None:
+        # Interning collapses the many repeated names and numbers in a large export to one string each.
+        for key in keys:
+            if key:
+                self._contact_lookup[sys.intern(key)] = record
+
+
+def _column_indices(
+    reader: Iterator[list[str]], path: Path, required: tuple[str, ...], optional: tuple[str, ...] = ()
+) -> list[int]:
+    """Consume the header row and pin each column name to its position; absent optional columns map to -1."""
+    header = next(reader, None)
+    if header is None:
+        # An empty file simply has no rows; every lookup then falls through to the -1 sentinel.
+        return [-1] * (len(required) + len(optional))
+    positions = {name: index for index, name in enumerate(header)}
+    for name in required:
+        if name not in positions:
+            raise ValueError(f"{path.name} is missing required column '{name}'")
+    return [positions.get(name, -1) for name in (*required, *optional)]
+
 
+def _cell(row: list[str], index: int, default: str | None = None) -> str | None:
+    if 0 <= index < len(row):
+        return row[index]
+    return default
+
+
+@lru_cache(maxsize=4096)
 def _normalize_phone(value: str | None) -> str | None:
     if not value:
         return None
@@ -211,34 +285,37 @@ def _normalize_phone(value: str | None) -> str | None:
     return value
 
 
+@lru_cache(maxsize=4096)
 def _determine_country(phone: str | None) -> str | None:
     if not phone:
         return None
     normalized = _normalize_phone(phone)
     if not normalized:
         return None
-    if normalized.startswith("+91"):
-        return "India"
-    if normalized.startswith("+44"):
-        return "United Kingdom"
-    if normalized.startswith("+1"):
-        return "United States"
-    return None
+    match = _COUNTRY_PREFIX_RE.match(normalized)
+    return _COUNTRY_BY_PREFIX[match.group(1)] if match else None
+
+
+def _fromisoformat(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+_parse_iso = ciso8601.parse_datetime if ciso8601 else _fromisoformat
 
 
 def _parse_datetime(value: str | None) -> datetime:
+    # Timestamps are normalised to UTC here because SQLite keeps only the wall-clock part of a datetime.
     if not value:
-        logger.warning("Missing timestamp for record; defaulting to current IST time")
-        return datetime.now(LOCAL_TIMEZONE)
-    value = value.replace("Z", "+00:00")
+        logger.warning("Missing timestamp for record; defaulting to current time")
+        return datetime.now(timezone.utc)
     try:
-        parsed = datetime.fromisoformat(value)
+        parsed = _parse_iso(value)
         if parsed.tzinfo is None:
-            return parsed.replace(tzinfo=LOCAL_TIMEZONE)
-        return parsed
+            parsed = parsed.replace(tzinfo=LOCAL_TIMEZONE)
+        return parsed.astimezone(timezone.utc)
     except ValueError:
-        logger.warning("Invalid timestamp '%s'; defaulting to current IST time", value)
-        return datetime.now(LOCAL_TIMEZONE)
+        logger.warning("Invalid timestamp '%s'; defaulting to current time", value)
+        return datetime.now(timezone.utc)
 
 
 def _extract_keywords(text: str) -> list[str]:
@@ -246,13 +323,16 @@ def _extract_keywords(text: str) -> list[str]:
     return sorted({term for term in SUSPICIOUS_TERMS if term in lowered})
 
 
-def _extract_media_path(message: dict) -> str | None:
-    media = message.get("media")
-    if not media:
+def _extract_media_path(message: ET.Element) -> str | None:
+    media = message.find("media")
+    if media is None:
         return None
-    if isinstance(media, dict):
-        return media.get("@file")
-    return None
+    return media.get("file")
+
+
+def _child_text(element: ET.Element, tag: str) -> str | None:
+    text = element.findtext(tag)
+    return text.strip() or None if text else None
 
 
 def _generate_message_id(sequence: int) -> str:
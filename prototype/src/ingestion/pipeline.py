@@ -2,12 +2,16 @@ from __future__ import annotations
 
 import json
 from dataclasses import asdict
+from datetime import datetime
 import logging
 import time
 from pathlib import Path
 from typing import Dict
 
-from src.config import DATA_DIR, DB_PATH, GRAPH_PATH, METADATA_PATH, VECTOR_INDEX_PATH
+from sqlalchemy import insert
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from src.config import DATA_DIR, DB_PATH, GRAPH_PATH, METADATA_PATH, VECTOR_INDEX_PATH, VECTOR_MATRIX_PATH
 from src.ingestion.parser import UFDRParser
 from src.storage.database import (
     Base,
@@ -18,8 +22,9 @@ from src.storage.database import (
     Location,
     Media,
     Message,
+    bump_data_generation,
     engine,
-    session_scope,
+    ingest_session_scope,
 )
 from src.storage.graph_store import GraphStore
 from src.storage.vector_store import VectorRecord, VectorStore
@@ -43,15 +48,42 @@ def _remove_with_retry(path: Path, attempts: int = 5, delay: float = 0.2) -> boo
     return False
 
 
+def _stored_isoformat(value: datetime) -> str:
+    # SQLite drops the offset on write, so mirror the naive UTC value a read-back would return.
+    return value.replace(tzinfo=None).isoformat()
+
+
+def _suffix(path: str) -> str:
+    # Same rule as PurePath.suffix without building a path object; also splits on Windows separators.
+    start = max(path.rfind("/"), path.rfind("\\")) + 1
+    dot = path.rfind(".", start)
+    return path[dot + 1:] if start < dot < len(path) - 1 else ""
+
+
+def _insert_returning_ids(session: Session, model: type, key: InstrumentedAttribute, rows: list[dict]) -> list[int]:
+    if not rows:
+        return []
+    return list(session.scalars(insert(model).returning(key, sort_by_parameter_order=True), rows))
+
+
 def reset_storage() -> None:
+    if DB_PATH.exists():
+        # Fold the WAL back into the database so nothing is left to replay against a fresh file.
+        with engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
     engine.dispose()
-    db_removed = _remove_with_retry(DB_PATH)
+    sidecars_removed = all(
+        [_remove_with_retry(DB_PATH.with_name(DB_PATH.name + suffix)) for suffix in ("-wal", "-shm")]
+    )
+    db_removed = sidecars_removed and _remove_with_retry(DB_PATH)
     if not db_removed:
         Base.metadata.drop_all(bind=engine)
 
     _remove_with_retry(VECTOR_INDEX_PATH)
+    _remove_with_retry(VECTOR_MATRIX_PATH)
     _remove_with_retry(METADATA_PATH)
     _remove_with_retry(GRAPH_PATH)
+    bump_data_generation()
 
 
 def ingest(root: Path | None = None, case_id: str = "CASE-01", reset: bool = True) -> dict:
@@ -63,7 +95,7 @@ def ingest(root: Path | None = None, case_id: str = "CASE-01", reset: bool = Tru
     parser = UFDRParser(root)
     parsed = parser.parse()
 
-    with session_scope() as session:
+    with ingest_session_scope() as session:
         device = Device(
             case_id=case_id,
             device_make="Samsung",
@@ -71,51 +103,61 @@ def ingest(root: Path | None = None, case_id: str = "CASE-01", reset: bool = Tru
             owner_name="John Doe",
         )
         session.add(device)
-        session.flush()
 
-        contact_map: Dict[str, Contact] = {}
-        for record in parsed.contacts:
-            contact = Contact(
+        # Contacts reference the device through the relationship, so the device row goes out in the same flush.
+        contacts = [
+            Contact(
                 external_id=record.external_id,
                 name=record.name,
                 phone_number=record.phone_number,
                 email=record.email,
                 source_app=record.source_app,
                 country=record.country,
-                device_id=device.device_id,
+                device=device,
             )
-            session.add(contact)
-            session.flush()
-            contact_map[record.external_id] = contact
+            for record in parsed.contacts
+        ]
+        # One flush per table: SQLAlchemy batches the INSERTs and returns the new keys in bulk.
+        session.add_all(contacts)
+        session.flush()
+        contact_map: Dict[str, Contact] = {contact.external_id: contact for contact in contacts}
 
-        vector_records: list[VectorRecord] = []
+        messages: list[Message] = []
         for record in parsed.messages:
             sender = contact_map.get(record.sender_external_id)
             receiver = contact_map.get(record.receiver_external_id) if record.receiver_external_id else None
-            message = Message(
-                external_id=record.external_id,
-                sender_id=sender.contact_id if sender else None,
-                receiver_id=receiver.contact_id if receiver else None,
-                timestamp=record.timestamp,
-                content=record.content,
-                app_name=record.app_name,
-                media_path=record.media_path,
-                device_id=device.device_id,
+            messages.append(
+                Message(
+                    external_id=record.external_id,
+                    sender_id=sender.contact_id if sender else None,
+                    receiver_id=receiver.contact_id if receiver else None,
+                    timestamp=record.timestamp,
+                    content=record.content,
+                    app_name=record.app_name,
+                    media_path=record.media_path,
+                    device_id=device.device_id,
+                )
             )
-            session.add(message)
-            session.flush()
+        session.add_all(messages)
+        session.flush()
 
-            for term in record.keywords:
-                keyword = Keyword(term=term, category="suspicious", message_id=message.message_id)
-                session.add(keyword)
+        vector_records: list[VectorRecord] = []
+        keyword_rows: list[dict] = []
+        media_rows: list[dict] = []
+        for record, message in zip(parsed.messages, messages):
+            sender = contact_map.get(record.sender_external_id)
+            keyword_rows.extend(
+                {"term": term, "category": "suspicious", "message_id": message.message_id} for term in record.keywords
+            )
             if record.media_path:
-                media = Media(
-                    file_path=record.media_path,
-                    file_type=Path(record.media_path).suffix.lstrip("."),
-                    timestamp=record.timestamp,
-                    message_id=message.message_id,
+                media_rows.append(
+                    {
+                        "file_path": record.media_path,
+                        "file_type": _suffix(record.media_path),
+                        "timestamp": record.timestamp,
+                        "message_id": message.message_id,
+                    }
                 )
-                session.add(media)
 
             vector_records.append(
                 VectorRecord(
@@ -127,31 +169,42 @@ def ingest(root: Path | None = None, case_id: str = "CASE-01", reset: bool = Tru
                 )
             )
 
+        call_rows: list[dict] = []
         for record in parsed.calls:
             caller = contact_map.get(record.caller_external_id)
             callee = contact_map.get(record.callee_external_id)
-            call = Call(
-                external_id=record.external_id,
-                caller_id=caller.contact_id if caller else None,
-                callee_id=callee.contact_id if callee else None,
-                call_type=record.call_type,
-                start_time=record.start_time,
-                duration_seconds=record.duration_seconds,
-                location=record.location,
-                device_id=device.device_id,
+            call_rows.append(
+                {
+                    "external_id": record.external_id,
+                    "caller_id": caller.contact_id if caller else None,
+                    "callee_id": callee.contact_id if callee else None,
+                    "call_type": record.call_type,
+                    "start_time": record.start_time,
+                    "duration_seconds": record.duration_seconds,
+                    "location": record.location,
+                    "device_id": device.device_id,
+                }
             )
-            session.add(call)
 
+        location_rows: list[dict] = []
         for record in parsed.locations:
             contact = contact_map.get(record.contact_external_id)
-            location = Location(
-                contact_id=contact.contact_id if contact else None,
-                latitude=record.latitude,
-                longitude=record.longitude,
-                timestamp=record.timestamp,
-                accuracy_meters=record.accuracy_meters,
+            location_rows.append(
+                {
+                    "contact_id": contact.contact_id if contact else None,
+                    "latitude": record.latitude,
+                    "longitude": record.longitude,
+                    "timestamp": record.timestamp,
+                    "accuracy_meters": record.accuracy_meters,
+                }
             )
-            session.add(location)
+
+        # Leaf rows go straight to executemany without ORM objects; calls and locations hand back their keys for the graph.
+        for model, rows in ((Keyword, keyword_rows), (Media, media_rows)):
+            if rows:
+                session.execute(insert(model), rows)
+        call_ids = _insert_returning_ids(session, Call, Call.call_id, call_rows)
+        location_ids = _insert_returning_ids(session, Location, Location.location_id, location_rows)
 
     # Build search index
     vector_store = VectorStore()
@@ -161,37 +214,35 @@ def ingest(root: Path | None = None, case_id: str = "CASE-01", reset: bool = Tru
     graph_store = GraphStore()
     for contact in contact_map.values():
         graph_store.add_person(contact.contact_id, contact.name, contact.phone_number)
-    with session_scope() as session:
-        messages = session.query(Message).all()
-        for message in messages:
-            keywords = [kw.term for kw in message.keywords]
-            graph_store.add_message(
-                message_id=message.message_id,
-                sender_contact_id=message.sender_id,
-                receiver_contact_id=message.receiver_id,
-                timestamp=message.timestamp.isoformat(),
-                content=message.content,
-                keywords=keywords,
-            )
-        calls = session.query(Call).all()
-        for call in calls:
-            graph_store.add_call(
-                call_id=call.call_id,
-                caller_contact_id=call.caller_id,
-                callee_contact_id=call.callee_id,
-                start_time=call.start_time.isoformat(),
-                duration_seconds=call.duration_seconds,
-            )
-        locations = session.query(Location).all()
-        for location in locations:
-            graph_store.add_location(
-                location_id=location.location_id,
-                contact_id=location.contact_id,
-                latitude=location.latitude,
-                longitude=location.longitude,
-                timestamp=location.timestamp.isoformat(),
-            )
+    # The graph is built from the rows just written rather than read back from the database.
+    for record, message in zip(parsed.messages, messages):
+        graph_store.add_message(
+            message_id=message.message_id,
+            sender_contact_id=message.sender_id,
+            receiver_contact_id=message.receiver_id,
+            timestamp=_stored_isoformat(record.timestamp),
+            content=record.content,
+            keywords=record.keywords,
+        )
+    for row, call_id in zip(call_rows, call_ids):
+        graph_store.add_call(
+            call_id=call_id,
+            caller_contact_id=row["caller_id"],
+            callee_contact_id=row["callee_id"],
+            start_time=_stored_isoformat(row["start_time"]),
+            duration_seconds=row["duration_seconds"],
+        )
+    for row, location_id in zip(location_rows, location_ids):
+        graph_store.add_location(
+            location_id=location_id,
+            contact_id=row["contact_id"],
+            latitude=row["latitude"],
+            longitude=row["longitude"],
+            timestamp=_stored_isoformat(row["timestamp"]),
+        )
     graph_store.save()
+    # Query engines in this process compare against the generation and drop caches built from the previous case.
+    bump_data_generation()
 
     return {
         "contacts": len(parsed.contacts),
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Generic, Hashable, Iterator, TypeVar
+
+V = TypeVar("V", bound=Hashable)
+
+
+class KeywordAutomaton(Generic[V]):
+    """Pure-Python Aho-Corasick automaton mirroring the ``pyahocorasick`` API.
+
+    Words are registered with ``add_word`` and compiled once with ``make_automaton``;
+    ``iter`` then reports every (possibly overlapping) occurrence in a single pass.
+    """
+
+    def __init__(self) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # Per-state outputs as insertion-ordered dicts, so a token shared by many values dedupes in O(1).
+        self._out: list[dict[V, None]] = [{}]
+        self._terminals: set[int] = set()
+        self._built = False
+
+    def __len__(self) -> int:
+        return len(self._terminals)
+
+    def add_word(self, word: str, value: V) -> None:
+        if not word:
+            return
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append({})
+            state = next_state
+        self._out[state][value] = None
+        self._terminals.add(state)
+        self._built = False
+
+    def make_automaton(self) -> None:
+        queue: deque[int] = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child].update(self._out[self._fail[child]])
+        self._built = True
+
+    def iter(self, text: str) -> Iterator[tuple[int, V]]:
+        if not self._built:
+            raise RuntimeError("Automaton not built. Call make_automaton() before iterating.")
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for value in out[state]:
+                yield index, value
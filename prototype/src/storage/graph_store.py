@@ -2,25 +2,53 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Iterable
+from typing import Hashable, Iterable, Iterator
 
 import networkx as nx
 from networkx.readwrite import json_graph
 
 from src.config import GRAPH_PATH
 
+try:  # pragma: no cover - optional faster JSON encoder
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
 
 class GraphStore:
     def __init__(self, path: Path | None = None) -> None:
         self.path = path or GRAPH_PATH
-        self.graph = nx.MultiDiGraph()
+        self._graph = nx.MultiDiGraph()
+        self._labels: dict = {}
+        # Ingest appends to these flat buffers; the networkx graph is only built when something reads it.
+        self._pending_nodes: dict[Hashable, dict] = {}
+        self._pending_edges: list[tuple[Hashable, Hashable, dict]] = []
+
+    @property
+    def graph(self) -> nx.MultiDiGraph:
+        if self._pending_nodes:
+            self._graph.add_nodes_from(self._pending_nodes.items())
+            self._graph.add_edges_from(self._pending_edges)
+            self._pending_nodes = {}
+            self._pending_edges = []
+        return self._graph
+
+    def _add_node(self, node: Hashable, **attrs) -> None:
+        self._pending_nodes.setdefault(node, {}).update(attrs)
+
+    def _add_edge(self, source: Hashable, target: Hashable, relation: str) -> None:
+        # Mirror add_edge, which registers unseen endpoints in source-then-target order.
+        self._pending_nodes.setdefault(source, {})
+        self._pending_nodes.setdefault(target, {})
+        self._pending_edges.append((source, target, {"relation": relation}))
 
     def add_person(self, contact_id: int, name: str | None, phone: str | None) -> None:
-        self.graph.add_node(
+        self._add_node(
             ("Person", contact_id),
             label=name or phone or f"Contact {contact_id}",
             phone=phone,
         )
+        self._labels.pop(("Person", contact_id), None)
 
     def add_message(
         self,
@@ -32,14 +60,14 @@ class GraphStore:
         keywords: Iterable[str],
     ) -> None:
         message_node = ("Message", message_id)
-        self.graph.add_node(message_node, label=f"Msg {message_id}", timestamp=timestamp, content=content)
-        self.graph.add_edge(("Person", sender_contact_id), message_node, relation="SENT")
+        self._add_node(message_node, label=f"Msg {message_id}", timestamp=timestamp, content=content)
+        self._add_edge(("Person", sender_contact_id), message_node, "SENT")
         if receiver_contact_id is not None:
-            self.graph.add_edge(message_node, ("Person", receiver_contact_id), relation="TO")
+            self._add_edge(message_node, ("Person", receiver_contact_id), "TO")
         for keyword in keywords:
             keyword_node = ("Keyword", keyword.lower())
-            self.graph.add_node(keyword_node, label=keyword.lower())
-            self.graph.add_edge(message_node, keyword_node, relation="MENTIONS")
+            self._add_node(keyword_node, label=keyword.lower())
+            self._add_edge(message_node, keyword_node, "MENTIONS")
 
     def add_call(
         self,
@@ -50,9 +78,9 @@ class GraphStore:
         duration_seconds: int,
     ) -> None:
         call_node = ("Call", call_id)
-        self.graph.add_node(call_node, label=f"Call {call_id}", start_time=start_time, duration=duration_seconds)
-        self.graph.add_edge(("Person", caller_contact_id), call_node, relation="ORIGINATED")
-        self.graph.add_edge(call_node, ("Person", callee_contact_id), relation="TARGET")
+        self._add_node(call_node, label=f"Call {call_id}", start_time=start_time, duration=duration_seconds)
+        self._add_edge(("Person", caller_contact_id), call_node, "ORIGINATED")
+        self._add_edge(call_node, ("Person", callee_contact_id), "TARGET")
 
     def add_location(
         self,
@@ -63,21 +91,61 @@ class GraphStore:
         timestamp: str,
     ) -> None:
         location_node = ("Location", location_id)
-        self.graph.add_node(location_node, label=f"Loc {location_id}", latitude=latitude, longitude=longitude, timestamp=timestamp)
-        self.graph.add_edge(("Person", contact_id), location_node, relation="WAS_AT")
+        self._add_node(location_node, label=f"Loc {location_id}", latitude=latitude, longitude=longitude, timestamp=timestamp)
+        self._add_edge(("Person", contact_id), location_node, "WAS_AT")
 
     def save(self) -> None:
-        data = json_graph.node_link_data(self.graph)
+        if self._graph.number_of_nodes():
+            data = json_graph.node_link_data(self.graph)
+        else:
+            data = _node_link_data(self._pending_nodes, self._pending_edges)
+        if orjson:
+            self.path.write_bytes(orjson.dumps(data))
+            return
         with self.path.open("w", encoding="utf-8") as fh:
             json.dump(data, fh)
 
     def load(self) -> None:
-        with self.path.open("r", encoding="utf-8") as fh:
-            data = json.load(fh)
-        self.graph = json_graph.node_link_graph(data, multigraph=True)
+        if orjson:
+            data = orjson.loads(self.path.read_bytes())
+        else:
+            with self.path.open("r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        self._graph = json_graph.node_link_graph(data, multigraph=True)
+        self._labels = {}
+        self._pending_nodes = {}
+        self._pending_edges = []
 
-    def neighbors(self, node) -> list:
-        return list(self.graph.neighbors(node))
+    def label(self, node) -> str:
+        # Labels are resolved once per node and reused by later queries against the same loaded graph.
+        label = self._labels.get(node)
+        if label is None:
+            label = self.graph.nodes[node].get("label") or str(node)
+            self._labels[node] = label
+        return label
+
+    def neighbors(self, node) -> Iterator:
+        # Lazy views: callers that need a list can wrap the result themselves.
+        return self.graph.neighbors(node)
 
     def edges(self, data: bool = False):
-        return list(self.graph.edges(data=data, keys=True))
+        return self.graph.edges(data=data, keys=True)
+
+
+def _node_link_data(nodes: dict[Hashable, dict], edges: list[tuple[Hashable, Hashable, dict]]) -> dict:
+    """Serialise buffered nodes and edges exactly as ``json_graph.node_link_data`` would for a MultiDiGraph."""
+    adjacency: dict[Hashable, dict[Hashable, list[dict]]] = {}
+    for source, target, attrs in edges:
+        adjacency.setdefault(source, {}).setdefault(target, []).append(attrs)
+    return {
+        "directed": True,
+        "multigraph": True,
+        "graph": {},
+        "nodes": [{**attrs, "id": node} for node, attrs in nodes.items()],
+        "links": [
+            {**attrs, "source": source, "target": target, "key": key}
+            for source in nodes
+            for target, group in adjacency.get(source, {}).items()
+            for key, attrs in enumerate(group)
+        ],
+    }
@@ -6,10 +6,16 @@ from pathlib import Path
 from typing import Iterable, List, Sequence
 
 import joblib
+import numpy as np
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.neighbors import NearestNeighbors
 
-from src.config import METADATA_PATH, VECTOR_INDEX_PATH
+from src.config import METADATA_PATH, VECTOR_FLOAT32, VECTOR_INDEX_PATH, VECTOR_MATRIX_PATH
+
+try:  # pragma: no cover - optional faster JSON encoder
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
 
 
 @dataclass
@@ -22,11 +28,17 @@ class VectorRecord:
 
 
 class VectorStore:
-    def __init__(self, index_path: Path | None = None, metadata_path: Path | None = None) -> None:
+    def __init__(
+        self,
+        index_path: Path | None = None,
+        metadata_path: Path | None = None,
+        matrix_path: Path | None = None,
+    ) -> None:
         self.index_path = index_path or VECTOR_INDEX_PATH
         self.metadata_path = metadata_path or METADATA_PATH
+        self.matrix_path = matrix_path or VECTOR_MATRIX_PATH
         self.vectorizer = TfidfVectorizer(stop_words="english")
-        self.nn = NearestNeighbors(metric="cosine")
+        self._matrix = None
         self._fitted = False
         self.metadata: list[VectorRecord] = []
 
@@ -35,39 +47,66 @@ class VectorStore:
             raise ValueError("Cannot build vector index with empty records")
         texts = [record.content for record in records]
         matrix = self.vectorizer.fit_transform(texts)
-        self.nn.fit(matrix)
+        self._matrix = _query_matrix(matrix)
         self.metadata = list(records)
         self._fitted = True
         self._persist(matrix)
 
     def _persist(self, matrix) -> None:
         VECTOR_INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
-        joblib.dump({"vectorizer": self.vectorizer, "nn": self.nn, "matrix": matrix}, self.index_path)
+        # The CSR arrays go to a flat .npz; only the fitted vectorizer still needs pickling.
+        sparse.save_npz(self.matrix_path, matrix.tocsr(), compressed=False)
+        joblib.dump({"vectorizer": self.vectorizer}, self.index_path)
+        metadata = [record.__dict__ for record in self.metadata]
+        if orjson:
+            self.metadata_path.write_bytes(orjson.dumps(metadata))
+            return
         with self.metadata_path.open("w", encoding="utf-8") as fh:
-            json.dump([record.__dict__ for record in self.metadata], fh, indent=2)
+            json.dump(metadata, fh)
 
     def load(self) -> None:
         if not self.index_path.exists() or not self.metadata_path.exists():
             raise FileNotFoundError("Vector index files missing; run ingestion first.")
         payload = joblib.load(self.index_path)
         self.vectorizer = payload["vectorizer"]
-        self.nn = payload["nn"]
-        matrix = payload["matrix"]
-        with self.metadata_path.open("r", encoding="utf-8") as fh:
-            metadata_dicts = json.load(fh)
+        # Indexes written before the matrix moved out of the pickle still carry it inline.
+        matrix = payload["matrix"] if "matrix" in payload else sparse.load_npz(self.matrix_path)
+        if orjson:
+            metadata_dicts = orjson.loads(self.metadata_path.read_bytes())
+        else:
+            with self.metadata_path.open("r", encoding="utf-8") as fh:
+                metadata_dicts = json.load(fh)
         self.metadata = [VectorRecord(**item) for item in metadata_dicts]
         self._fitted = True
-        self._matrix = matrix  # store for querying
+        self._matrix = _query_matrix(matrix)  # store for querying
 
     def query(self, text: str, k: int = 5) -> List[VectorRecord]:
         if not self._fitted:
             raise RuntimeError("Vector index not built. Load or build before querying.")
-        query_vector = self.vectorizer.transform([text])
-        distances, indices = self.nn.kneighbors(query_vector, n_neighbors=min(k, len(self.metadata)))
-        ranked: list[VectorRecord] = []
-        for idx in indices[0]:
-            ranked.append(self.metadata[idx])
-        return ranked
+        k = min(k, len(self.metadata))
+        if k <= 0:
+            return []
+        query_vector = self.vectorizer.transform([text]).astype(self._matrix.dtype, copy=False)
+        # TF-IDF rows are L2-normalised, so one sparse product gives every cosine similarity at once.
+        distances = 1.0 - (self._matrix @ query_vector.T).toarray().ravel()
+        np.clip(distances, 0.0, 2.0, out=distances)
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top])]
+        return [self.metadata[idx] for idx in top]
+
+    def embed(self, text: str):
+        if not self._fitted:
+            raise RuntimeError("Vector index not built. Load or build before querying.")
+        return self.vectorizer.transform([text])
+
+    @staticmethod
+    def similarity(first, second) -> float:
+        # TF-IDF rows are L2-normalised, so their dot product is the cosine similarity.
+        return float(first.multiply(second).sum())
 
     def iter_metadata(self) -> Iterable[VectorRecord]:
         return iter(self.metadata)
+
+
+def _query_matrix(matrix):
+    return matrix.astype(np.float32) if VECTOR_FLOAT32 else matrix
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+from typing import Any, Callable
+from unittest import mock
+
+from src import app, config
+from src.ai import query_engine
+from src.ai.query_engine import QueryEngine
+from src.ingestion import pipeline
+from src.storage import database, graph_store, vector_store
+
+# Modules that bind storage paths at import time, and the config names each of them reads.
+_PATH_BINDINGS = (
+    (pipeline, ("DB_PATH", "GRAPH_PATH", "METADATA_PATH", "VECTOR_INDEX_PATH", "VECTOR_MATRIX_PATH")),
+    (query_engine, ("GRAPH_PATH", "METADATA_PATH", "VECTOR_INDEX_PATH", "VECTOR_MATRIX_PATH")),
+    (vector_store, ("METADATA_PATH", "VECTOR_INDEX_PATH", "VECTOR_MATRIX_PATH")),
+    (graph_store, ("GRAPH_PATH",)),
+)
+
+
+def use_temporary_storage(add_cleanup: Callable[..., Any]) -> Path:
+    """Point the database, indexes, graph and upload root at a fresh temporary directory.
+
+    ``add_cleanup`` is ``TestCase.addCleanup`` or ``addClassCleanup``; it restores the configured paths and
+    removes the directory, so tests never touch the artifacts checked in next to the project.
+    """
+
+    tmp = tempfile.TemporaryDirectory()
+    add_cleanup(tmp.cleanup)
+    root = Path(tmp.name).resolve()
+    (root / config.UPLOAD_ROOT.name).mkdir()
+
+    test_engine = database.create_sqlite_engine(root / config.DB_PATH.name)
+    add_cleanup(test_engine.dispose)
+    patchers = [
+        mock.patch.object(database, "engine", test_engine),
+        mock.patch.object(pipeline, "engine", test_engine),
+        mock.patch.object(app, "UPLOAD_ROOT", root / config.UPLOAD_ROOT.name),
+    ]
+    for module, names in _PATH_BINDINGS:
+        patchers.extend(mock.patch.object(module, name, root / getattr(config, name).name) for name in names)
+    for patcher in patchers:
+        patcher.start()
+        add_cleanup(patcher.stop)
+
+    original_engine = database.SessionLocal.kw["bind"]
+    database.SessionLocal.configure(bind=test_engine)
+    add_cleanup(database.SessionLocal.configure, bind=original_engine)
+    database.Base.metadata.create_all(bind=test_engine)
+
+    QueryEngine.invalidate_shared_state()
+    add_cleanup(QueryEngine.invalidate_shared_state)
+    return root
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import io
+import sys
+import tarfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.testclient import TestClient
+from starlette.datastructures import UploadFile
+
+from src import app as app_module
+from src.config import DATA_DIR
+from src.ingestion.pipeline import ingest
+from tests.support import use_temporary_storage
+
+CASE_FILES = ("contacts.csv", "calls.csv", "locations.csv", "messages.xml")
+
+
+class ReloadEndpointTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        use_temporary_storage(cls.addClassCleanup)
+        ingest(reset=True)
+
+    def setUp(self) -> None:
+        self.client = TestClient(app_module.app)
+
+    def test_engine_held_across_reload_keeps_answering(self) -> None:
+        engine = app_module.get_engine()
+        response = self.client.post("/admin/reload")
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNot(app_module.get_engine(), engine)
+        self.assertGreater(len(engine.answer("crypto wallet transfer").messages), 0)
+
+    def test_query_after_reload(self) -> None:
+        self.client.post("/admin/reload")
+        response = self.client.post("/query", json={"query": "crypto wallet transfer"})
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(response.json()["messages"]), 0)
+
+
+def _zip_bytes(members: dict[str, bytes], compression: int = zipfile.ZIP_STORED) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def _tar_bytes(members: list[tarfile.TarInfo | tuple[str, bytes]], mode: str = "w") -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as archive:
+        for member in members:
+            if isinstance(member, tarfile.TarInfo):
+                archive.addfile(member)
+            else:
+                name, data = member
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def _case_members(prefix: str = "") -> dict[str, bytes]:
+    return {f"{prefix}{name}": (DATA_DIR / name).read_bytes() for name in CASE_FILES}
+
+
+class UploadEndpointTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = use_temporary_storage(self.addCleanup)
+        self.upload_root = app_module.UPLOAD_ROOT
+        self.client = TestClient(app_module.app)
+
+    def upload(self, filename: str, payload: bytes):
+        return self.client.post("/upload-ufdr", files={"file": (filename, payload, "application/octet-stream")})
+
+    def assert_case_extracted(self, response) -> None:
+        self.assertEqual(response.status_code, 200, response.text)
+        data_path = Path(response.json()["data_path"])
+        self.assertIn(self.upload_root, data_path.parents)
+        for name in CASE_FILES:
+            self.assertEqual((data_path / name).read_bytes(), (DATA_DIR / name).read_bytes())
+
+    def test_zip_member_escaping_upload_dir_is_rejected(self) -> None:
+        response = self.upload("case.zip", _zip_bytes({"../evil": b"owned", **_case_members()}))
+        self.assert_rejected_without_leftovers(response)
+        self.assertFalse((self.tmp / "evil").exists())
+        self.assertFalse((self.upload_root / "evil").exists())
+
+    def test_zip_absolute_member_is_rejected(self) -> None:
+        target = self.tmp / "absolute_evil"
+        response = self.upload("case.ufdr", _zip_bytes({str(target): b"owned"}))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(target.exists())
+
+    def test_tar_links_are_rejected(self) -> None:
+        for link_type in (tarfile.SYMTYPE, tarfile.LNKTYPE):
+            with self.subTest(link_type=link_type):
+                link = tarfile.TarInfo("contacts.csv")
+                link.type = link_type
+                link.linkname = "/etc/passwd"
+                response = self.upload("case.tar", _tar_bytes([link]))
+                self.assertEqual(response.status_code, 400)
+
+    def assert_rejected_without_leftovers(self, response) -> None:
+        self.assertEqual(response.status_code, 400, response.text)
+        self.assertEqual(list(self.upload_root.iterdir()), [])
+
+    def test_corrupt_deflate_stream_is_rejected(self) -> None:
+        payload = bytearray(_zip_bytes(_case_members(), compression=zipfile.ZIP_DEFLATED))
+        for offset in range(100, 400):  # inside the first member's compressed data
+            payload[offset] ^= 0xFF
+        self.assert_rejected_without_leftovers(self.upload("case.zip", bytes(payload)))
+
+    def test_truncated_zip_is_rejected(self) -> None:
+        payload = _zip_bytes(_case_members(), compression=zipfile.ZIP_DEFLATED)
+        self.assert_rejected_without_leftovers(self.upload("case.ufdr", payload[: len(payload) // 2]))
+
+    def test_truncated_tgz_is_rejected_without_partial_extraction(self) -> None:
+        payload = _tar_bytes(list(_case_members().items()), mode="w:gz")
+        self.assert_rejected_without_leftovers(self.upload("case.tgz", payload[: len(payload) * 3 // 4]))
+
+    def test_ufdr_round_trip(self) -> None:
+        self.assert_case_extracted(self.upload("case.ufdr", _zip_bytes(_case_members("export/"))))
+
+    def test_tgz_round_trip(self) -> None:
+        self.assert_case_extracted(self.upload("case.tgz", _tar_bytes(list(_case_members().items()), mode="w:gz")))
+
+    def test_tar_round_trip(self) -> None:
+        self.assert_case_extracted(self.upload("case.tar", _tar_bytes(list(_case_members("export/").items()))))
+
+    def test_non_archive_upload_is_written_in_chunks(self) -> None:
+        payload = bytes(range(256)) * 10_000  # ~2.5 MiB, more than two read chunks
+        read = UploadFile.read
+        with mock.patch.object(UploadFile, "read", autospec=True, side_effect=read) as spy:
+            response = self.upload("notes.bin", payload)
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertGreaterEqual(spy.call_count, 3)
+        self.assertTrue(all(call.args[1] == 1_048_576 for call in spy.call_args_list))
+        self.assertEqual((Path(response.json()["data_path"]) / "notes.bin").read_bytes(), payload)
+
+
+if __name__ == "__main__":
+    unittest.main()
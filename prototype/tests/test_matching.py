@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.matching import KeywordAutomaton
+
+
+class KeywordAutomatonTest(unittest.TestCase):
+    def test_reports_overlapping_matches(self) -> None:
+        automaton: KeywordAutomaton[str] = KeywordAutomaton()
+        for word in ("john doe", "doe", "jane doe", "john"):
+            automaton.add_word(word, word)
+        automaton.make_automaton()
+        hits = {value for _, value in automaton.iter("messages between john doe and jane doe")}
+        self.assertEqual(hits, {"john doe", "doe", "jane doe", "john"})
+
+    def test_duplicate_inserts_are_counted_and_reported_once(self) -> None:
+        automaton: KeywordAutomaton[int] = KeywordAutomaton()
+        for contact_id in range(500):
+            automaton.add_word("john", contact_id)
+            automaton.add_word("john", contact_id)
+        automaton.add_word("doe", 1)
+        automaton.make_automaton()
+        self.assertEqual(len(automaton), 2)
+        hits = [value for _, value in automaton.iter("john")]
+        self.assertEqual(hits, list(range(500)))
+
+    def test_requires_build_before_iter(self) -> None:
+        automaton: KeywordAutomaton[int] = KeywordAutomaton()
+        automaton.add_word("btc", 1)
+        with self.assertRaises(RuntimeError):
+            list(automaton.iter("btc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
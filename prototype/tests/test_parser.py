@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.ingestion.parser import UFDRParser
+
+CONTACTS_CSV = "ContactID,Name,PhoneNumber,Email,SourceApp\n1,John Doe,+919876543210,john@example.com,WhatsApp\n"
+CALLS_CSV = "CallID,CallerID,CalleeID,Type,StartTime,DurationSeconds,Location\n"
+EMPTY_MESSAGES_XML = "<messages />"
+
+
+class ParserTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+
+    def write_case(self, **files: str) -> UFDRParser:
+        defaults = {"contacts.csv": CONTACTS_CSV, "calls.csv": CALLS_CSV, "messages.xml": EMPTY_MESSAGES_XML}
+        for name, content in {**defaults, **{key.replace("_", "."): value for key, value in files.items()}}.items():
+            (self.root / name).write_text(content, encoding="utf-8")
+        return UFDRParser(self.root)
+
+
+class CsvParsingTest(ParserTestCase):
+    def test_missing_required_column_names_file_and_column(self) -> None:
+        parser = self.write_case(calls_csv="CallID,CallerID,Type\n1001,1,Outgoing\n")
+        with self.assertRaises(ValueError) as ctx:
+            parser.parse()
+        self.assertIn("calls.csv", str(ctx.exception))
+        self.assertIn("CalleeID", str(ctx.exception))
+
+    def test_empty_csv_files_yield_no_rows(self) -> None:
+        parser = self.write_case(contacts_csv="", calls_csv="", locations_csv="")
+        parsed = parser.parse()
+        self.assertEqual(parsed.contacts, [])
+        self.assertEqual(parsed.calls, [])
+        self.assertEqual(parsed.locations, [])
+
+    def test_missing_optional_columns_and_short_rows(self) -> None:
+        parser = self.write_case(
+            contacts_csv="ContactID,Name\n1,John Doe\n2\n",
+            calls_csv="CallID,CallerID,CalleeID\n1001,1,2\n",
+        )
+        parsed = parser.parse()
+        self.assertEqual(
+            [(contact.external_id, contact.name, contact.phone_number) for contact in parsed.contacts],
+            [("1", "John Doe", None), ("2", None, None)],
+        )
+        call = parsed.calls[0]
+        self.assertEqual((call.call_type, call.duration_seconds, call.location), ("Unknown", 0, None))
+
+
+class MessageParsingTest(ParserTestCase):
+    def parse_messages(self, body: str):
+        parser = self.write_case(messages_xml=f"<messages>{body}</messages>")
+        return parser.parse().messages
+
+    def test_attribute_and_child_element_forms(self) -> None:
+        attribute_form, child_form = self.parse_messages(
+            """
+            <chat app="WhatsApp">
+              <message id="m1" sender="John Doe" receiver="Jane" timestamp="2025-09-12T20:15:00Z">
+                <text>BTC ready</text>
+              </message>
+              <message>
+                <id>m2</id>
+                <sender> John Doe </sender>
+                <receiver>Jane</receiver>
+                <timestamp>2025-09-12T20:16:00Z</timestamp>
+                <text>  wallet  </text>
+                <media file="media/IMG_001.jpg" type="image" />
+              </message>
+            </chat>
+            """
+        )
+        self.assertEqual(attribute_form.external_id, "m1")
+        self.assertEqual(child_form.external_id, "m2")
+        for record in (attribute_form, child_form):
+            self.assertEqual(record.sender_external_id, "1")
+            self.assertEqual(record.receiver_external_id, "Jane")
+            self.assertEqual(record.app_name, "WhatsApp")
+        self.assertEqual(attribute_form.timestamp, datetime(2025, 9, 12, 20, 15, tzinfo=timezone.utc))
+        self.assertEqual((attribute_form.content, attribute_form.keywords), ("BTC ready", ["btc"]))
+        self.assertEqual((child_form.content, child_form.keywords), ("wallet", ["wallet"]))
+        self.assertIsNone(attribute_form.media_path)
+        self.assertEqual(child_form.media_path, "media/IMG_001.jpg")
+
+    def test_child_elements_take_precedence_over_attributes(self) -> None:
+        (record,) = self.parse_messages(
+            """
+            <chat app="Signal">
+              <message id="attr-id" sender="Someone Else" timestamp="2020-01-01T00:00:00Z">
+                <id>child-id</id>
+                <sender>John Doe</sender>
+                <timestamp>2025-09-12T20:15:00Z</timestamp>
+                <text>hi</text>
+              </message>
+            </chat>
+            """
+        )
+        self.assertEqual(record.external_id, "attr-id")
+        self.assertEqual(record.sender_external_id, "1")
+        self.assertEqual(record.timestamp, datetime(2025, 9, 12, 20, 15, tzinfo=timezone.utc))
+
+    def test_empty_text_and_missing_optional_elements(self) -> None:
+        empty_text, bare = self.parse_messages(
+            """
+            <chat>
+              <message id="m1"><sender>John Doe</sender><timestamp>2025-09-12T20:15:00Z</timestamp><text/></message>
+              <message><timestamp>2025-09-12T20:16:00Z</timestamp></message>
+            </chat>
+            """
+        )
+        self.assertEqual((empty_text.content, empty_text.keywords), ("", []))
+        self.assertIsNone(empty_text.app_name)
+        self.assertIsNone(empty_text.receiver_external_id)
+        self.assertIsNone(empty_text.media_path)
+        self.assertEqual(bare.external_id, "synthetic_msg_0001")
+        self.assertEqual(bare.sender_external_id, "Unknown")
+        self.assertEqual(bare.content, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
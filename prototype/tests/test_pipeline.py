@@ -11,22 +11,20 @@ if str(ROOT) not in sys.path:
 from src.ai.query_engine import QueryEngine
 from src.config import DB_PATH, GRAPH_PATH, METADATA_PATH, VECTOR_INDEX_PATH
 from src.ingestion.pipeline import ingest, reset_storage
+from src.storage import database
+from src.storage.database import session_scope
+from tests.support import use_temporary_storage
 
 
 class PipelineIntegrationTest(unittest.TestCase):
     def setUp(self) -> None:
-        reset_storage()
-
-    def tearDown(self) -> None:
-        reset_storage()
+        self.storage = use_temporary_storage(self.addCleanup)
 
     def test_ingest_creates_artifacts(self) -> None:
         stats = ingest(reset=True)
         self.assertGreater(stats["messages"], 0)
-        self.assertTrue(DB_PATH.exists())
-        self.assertTrue(VECTOR_INDEX_PATH.exists())
-        self.assertTrue(METADATA_PATH.exists())
-        self.assertTrue(GRAPH_PATH.exists())
+        for path in (DB_PATH, VECTOR_INDEX_PATH, METADATA_PATH, GRAPH_PATH):
+            self.assertTrue((self.storage / path.name).exists(), path.name)
 
     def test_query_engine_returns_message(self) -> None:
         ingest(reset=True)
@@ -44,6 +42,20 @@ class PipelineIntegrationTest(unittest.TestCase):
         self.assertIn(first_location["contact"], {"Bitcoin Broker", "Jane Smith", "John Doe"})
         self.assertIn("location", response.summary.lower())
 
+    def test_reset_removes_wal_sidecars(self) -> None:
+        ingest(reset=True)
+        # A connection still open on another thread survives engine.dispose() and keeps the WAL alive.
+        with database.engine.connect() as held:
+            held.exec_driver_sql("SELECT COUNT(*) FROM messages").scalar()
+            reset_storage()
+            for suffix in ("", "-wal", "-shm"):
+                self.assertFalse((self.storage / f"{DB_PATH.name}{suffix}").exists(), suffix)
+
+    def test_query_connections_keep_default_page_cache(self) -> None:
+        ingest(reset=True)
+        with session_scope() as session:
+            self.assertEqual(session.connection().exec_driver_sql("PRAGMA cache_size").scalar(), -2000)
+
 
 if __name__ == "__main__":
     unittest.main()
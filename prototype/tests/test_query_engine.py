@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import copy
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.ai import query_engine
+from src.ai.query_engine import QueryEngine
+from src.storage.vector_store import VectorStore
+from src.config import DATA_DIR
+from src.ingestion.pipeline import ingest
+from tests.support import use_temporary_storage
+
+QUERIES = (
+    "show me foreign crypto messages after 10 pm",
+    "show me last location visited",
+    "calls with the bitcoin broker",
+    "network connections of john doe",
+    "wallet transfer",
+)
+
+
+def _evidence(response) -> tuple:
+    return (response.messages, response.calls, response.locations, response.graph_insights)
+
+
+class ConcurrentAnswerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        use_temporary_storage(cls.addClassCleanup)
+        ingest(reset=True)
+
+    def test_parallel_answers_match_sequential(self) -> None:
+        with mock.patch.object(query_engine, "PARALLEL_QUERIES", True):
+            engine = QueryEngine()
+            self.assertIsNotNone(engine._shared_executor())
+            QueryEngine.invalidate_shared_state()
+            expected = {query: _evidence(engine.answer(query)) for query in QUERIES}
+
+            QueryEngine.invalidate_shared_state()
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                futures = [(query, pool.submit(engine.answer, query)) for query in QUERIES * 4]
+                for query, future in futures:
+                    self.assertEqual(_evidence(future.result()), expected[query])
+
+
+class ResponseCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        use_temporary_storage(cls.addClassCleanup)
+        ingest(reset=True)
+
+    def setUp(self) -> None:
+        QueryEngine.invalidate_shared_state()
+        self.engine = QueryEngine()
+        patcher = mock.patch.object(self.engine, "_gather_evidence", wraps=self.engine._gather_evidence)
+        self.gather = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_exact_hit_skips_retrieval_and_planning(self) -> None:
+        first = self.engine.answer("crypto broker")
+        with mock.patch.object(query_engine, "plan_query") as planner, mock.patch.object(
+            self.engine, "_vector_candidates"
+        ) as vectors:
+            second = self.engine.answer("  Crypto   BROKER ")
+        planner.assert_not_called()
+        vectors.assert_not_called()
+        self.assertEqual(self.gather.call_count, 1)
+        self.assertEqual(second.query, "  Crypto   BROKER ")
+        self.assertEqual(_evidence(second), _evidence(first))
+
+    def test_hits_return_independent_copies(self) -> None:
+        first = self.engine.answer("crypto broker")
+        expected = copy.deepcopy(_evidence(first))
+        first.messages[0]["content"] = "tampered"
+        first.messages.clear()
+        first.graph_insights.append("tampered")
+        second = self.engine.answer("crypto broker")
+        self.assertEqual(_evidence(second), expected)
+        second.messages.clear()
+        self.assertEqual(_evidence(self.engine.answer("crypto broker")), expected)
+
+    def test_near_miss_reuses_evidence(self) -> None:
+        first = self.engine.answer("crypto broker")
+        second = self.engine.answer("broker crypto")
+        self.assertEqual(self.gather.call_count, 1)
+        self.assertEqual(second.query, "broker crypto")
+        self.assertEqual(_evidence(second), _evidence(first))
+
+    def test_similarity_below_threshold_gathers_again(self) -> None:
+        self.engine.answer("crypto broker")
+        with mock.patch.object(VectorStore, "similarity", return_value=0.5):
+            self.engine.answer("broker crypto")
+        self.assertEqual(self.gather.call_count, 2)
+
+    def test_expired_entries_are_not_served(self) -> None:
+        self.engine.answer("crypto broker")
+        later = time.monotonic() + query_engine._RESPONSE_CACHE_TTL_SECONDS + 1
+        with mock.patch.object(query_engine, "monotonic", return_value=later):
+            self.engine.answer("crypto broker")
+        self.assertEqual(self.gather.call_count, 2)
+
+    def test_invalidate_shared_state_clears_cache(self) -> None:
+        self.engine.answer("crypto broker")
+        QueryEngine.invalidate_shared_state()
+        self.engine.answer("crypto broker")
+        self.assertEqual(self.gather.call_count, 2)
+
+
+class ReingestTest(unittest.TestCase):
+    def setUp(self) -> None:
+        use_temporary_storage(self.addCleanup)
+
+    def test_reingest_with_same_contact_count_refreshes_contacts(self) -> None:
+        ingest(reset=True)
+        engine = QueryEngine()
+        before = {contact.name for contact in engine._load_contacts().contacts}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            case_dir = Path(tmp)
+            # Same contacts and row counts, different people: the (MAX(id), COUNT) version cannot tell them apart.
+            for name in ("contacts.csv", "calls.csv", "locations.csv", "messages.xml"):
+                text = (DATA_DIR / name).read_text(encoding="utf-8")
+                (case_dir / name).write_text(text.replace("John Doe", "Alan Turing"), encoding="utf-8")
+            ingest(root=case_dir, reset=True)
+
+        after = {contact.name for contact in engine._load_contacts().contacts}
+        self.assertEqual(len(after), len(before))
+        self.assertIn("Alan Turing", after)
+        self.assertNotIn("John Doe", after)
+
+
+class ContactSnapshotTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        use_temporary_storage(cls.addClassCleanup)
+        ingest(reset=True)
+
+    def test_ttl_refresh_of_unchanged_contacts_keeps_automaton(self) -> None:
+        engine = QueryEngine()
+        first = engine._load_contacts()
+        later = time.monotonic() + query_engine._CONTACT_CACHE_TTL_SECONDS + 1
+        with mock.patch.object(query_engine, "monotonic", return_value=later):
+            second = engine._load_contacts()
+        self.assertIsNot(second, first)
+        self.assertEqual(second.loaded_at, later)
+        self.assertIs(second.automaton, first.automaton)
+
+
+class NormalizeRangeTest(unittest.TestCase):
+    def test_reversed_range_covers_both_whole_days(self) -> None:
+        june_1 = datetime(2025, 6, 1, 10, 0)
+        june_5 = datetime(2025, 6, 5, 10, 0)
+        # Local (IST) midnight on June 1 through the last instant of June 5, expressed in UTC.
+        expected = (
+            datetime(2025, 5, 31, 18, 30, tzinfo=timezone.utc),
+            datetime(2025, 6, 5, 18, 29, 59, 999999, tzinfo=timezone.utc),
+        )
+        self.assertEqual(query_engine._normalize_range(june_1, june_5), expected)
+        self.assertEqual(query_engine._normalize_range(june_5, june_1), expected)
+
+    def test_single_bound_covers_one_day(self) -> None:
+        start, end = query_engine._normalize_range(None, datetime(2025, 6, 5, 23, 0))
+        self.assertEqual(start, datetime(2025, 6, 4, 18, 30, tzinfo=timezone.utc))
+        self.assertEqual(end, datetime(2025, 6, 5, 18, 29, 59, 999999, tzinfo=timezone.utc))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.ai import query_planner
+
+PLAN_JSON = '{"include_messages": true, "person_names": ["John Doe"], "topics": ["Crypto"]}'
+
+
+class PlanQueryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        query_planner._request_plan.cache_clear()
+        self.addCleanup(query_planner._request_plan.cache_clear)
+        self.model = mock.Mock()
+        self.model.generate_content.return_value = SimpleNamespace(text=PLAN_JSON)
+        for patcher in (
+            mock.patch.dict("os.environ", {"GEMINI_API_KEY": "secret-key"}),
+            mock.patch.object(query_planner, "genai", object()),
+            mock.patch.object(query_planner, "get_model", return_value=self.model),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_repeated_query_is_planned_once(self) -> None:
+        first = query_planner.plan_query("crypto messages from john")
+        second = query_planner.plan_query("crypto messages from john")
+        self.model.generate_content.assert_called_once()
+        self.assertEqual(first, second)
+        self.assertEqual((first.person_names, first.topics), (["John Doe"], ["crypto"]))
+
+    def test_callers_cannot_mutate_cached_plan(self) -> None:
+        first = query_planner.plan_query("crypto messages from john")
+        first.person_names.append("Mallory")
+        first.topics.clear()
+        second = query_planner.plan_query("crypto messages from john")
+        self.assertEqual((second.person_names, second.topics), (["John Doe"], ["crypto"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.ai import report_generator
+
+EVIDENCE = {
+    "summary": "Found 1 message.",
+    "messages": [{"sender": "John Doe", "content": "BTC ready"}],
+    "calls": [],
+    "locations": [],
+    "graph_insights": [],
+}
+
+
+class GeneratedTextCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        report_generator._text_cache.clear()
+        self.addCleanup(report_generator._text_cache.clear)
+        self.model = mock.Mock()
+        self.model.generate_content.return_value = SimpleNamespace(text="  Narrative.  ")
+        for patcher in (
+            mock.patch.dict("os.environ", {"GEMINI_API_KEY": "secret-key", "GEMINI_MODEL_NAME": "test-model"}),
+            mock.patch.object(report_generator, "genai", object()),
+            mock.patch.object(report_generator, "get_model", return_value=self.model),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_repeated_prompt_reuses_text(self) -> None:
+        first = report_generator.generate_report(query="crypto", contacts=[], **EVIDENCE)
+        second = report_generator.generate_report(query="crypto", contacts=[], **EVIDENCE)
+        self.assertEqual((first, second), ("Narrative.", "Narrative."))
+        self.model.generate_content.assert_called_once()
+
+    def test_cache_holds_only_digests_and_text(self) -> None:
+        report_generator.generate_report(query="crypto", contacts=[], **EVIDENCE)
+        report_generator.generate_brief(query="crypto", **EVIDENCE)
+        self.assertEqual(self.model.generate_content.call_count, 2)
+        for (model_name, digest), text in report_generator._text_cache.items():
+            self.assertEqual(model_name, "test-model")
+            self.assertEqual(len(digest), 32)
+            self.assertEqual(text, "Narrative.")
+
+    def test_empty_replies_are_not_cached(self) -> None:
+        self.model.generate_content.return_value = SimpleNamespace(text="", candidates=[])
+        report_generator.generate_brief(query="crypto", **EVIDENCE)
+        report_generator.generate_brief(query="crypto", **EVIDENCE)
+        self.assertEqual(self.model.generate_content.call_count, 2)
+        self.assertEqual(len(report_generator._text_cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()